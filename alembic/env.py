@@ -12,6 +12,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from app.core.config import settings
 from app.models.domain.base import Base
+from app.models.domain import analytics, archive, draw, ticket_hold, user, waiting_room  # noqa: F401
 
 config = context.config
 
@@ -0,0 +1,36 @@
+"""Add waiting room
+
+Revision ID: 0b7d3e5a8c14
+Revises: 6e0b9f4d2a35
+Create Date: 2026-10-19 18:40:51.226904
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0b7d3e5a8c14"
+down_revision = "6e0b9f4d2a35"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "waiting_room",
+        sa.Column("raffle_id", sa.Integer(), sa.ForeignKey("raffle.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("rate", sa.Float(), nullable=False),
+        sa.Column("next_admission", sa.Float(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("raffle_id"),
+    )
+    op.create_index("ix_waiting_room_id", "waiting_room", ["id"])
+
+
+def downgrade():
+    op.drop_table("waiting_room")
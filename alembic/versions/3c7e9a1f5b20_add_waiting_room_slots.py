@@ -0,0 +1,46 @@
+"""Add waiting room slots
+
+Revision ID: 3c7e9a1f5b20
+Revises: 9e4b7c2a6d18
+Create Date: 2026-10-20 09:12:44.518230
+
+One row per user queued in a waiting room, so joining again hands back
+the user's place instead of booking another one.
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3c7e9a1f5b20"
+down_revision = "9e4b7c2a6d18"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "waiting_room_slot",
+        sa.Column(
+            "raffle_id",
+            sa.Integer(),
+            sa.ForeignKey("waiting_room.raffle_id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("admit_at", sa.Float(), nullable=False),
+        sa.Column("expires_at", sa.Float(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("raffle_id", "user_id"),
+    )
+    op.create_index("ix_waiting_room_slot_id", "waiting_room_slot", ["id"])
+    op.create_index("ix_waiting_room_slot_expires_at", "waiting_room_slot", ["expires_at"])
+
+
+def downgrade():
+    op.drop_table("waiting_room_slot")
@@ -0,0 +1,133 @@
+"""Partition purchase by month
+
+Revision ID: 3f6b2d9c41a7
+Revises: ec1edf68eefe
+Create Date: 2026-10-19 11:04:17.228391
+
+Rebuilds purchase as a table range partitioned on purchase_date, with one
+partition per month of existing data through MONTHS_AHEAD
+months from now plus a default partition, and moves payment intent
+uniqueness to purchase_payment. Rows are copied in one transaction
+that holds an exclusive lock on purchase; run it in a maintenance window.
+
+"""
+
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3f6b2d9c41a7"
+down_revision = "ec1edf68eefe"
+branch_labels = None
+depends_on = None
+
+COLUMNS = "id, user_id, raffle_id, quantity, total_amount, transaction_id, purchase_date, created_at, updated_at"
+MONTHS_AHEAD = 3
+
+
+def month_start(day, months=0):
+    index = day.year * 12 + day.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def create_indexes():
+    op.create_index("ix_purchase_id", "purchase", ["id"])
+    op.create_index("ix_purchase_transaction_id", "purchase", ["transaction_id"])
+    op.create_index(
+        "ix_purchase_user_id_raffle_id",
+        "purchase",
+        ["user_id", "raffle_id"],
+        postgresql_include=["quantity", "total_amount"],
+    )
+    op.create_index("ix_purchase_raffle_id_user_id", "purchase", ["raffle_id", "user_id"])
+    op.create_index("ix_purchase_user_id_purchase_date", "purchase", ["user_id", "purchase_date"])
+
+
+def create_purchase_table(*constraints, **kwargs):
+    op.create_table(
+        "purchase",
+        sa.Column("id", sa.Integer(), server_default=sa.text("nextval('purchase_id_seq')"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("raffle_id", sa.Integer(), sa.ForeignKey("raffle.id"), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("total_amount", sa.Numeric(10, 2), nullable=False),
+        sa.Column("transaction_id", sa.String(), nullable=False),
+        sa.Column("purchase_date", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        *constraints,
+        **kwargs,
+    )
+
+
+def swap_out_old_table():
+    """Rename the current purchase table aside, keeping its id sequence."""
+    op.execute("ALTER TABLE purchase RENAME TO purchase_old")
+    op.execute("ALTER SEQUENCE purchase_id_seq OWNED BY NONE")
+    for constraint in sa.inspect(op.get_bind()).get_indexes("purchase_old"):
+        op.drop_index(constraint["name"], table_name="purchase_old")
+    op.execute("ALTER TABLE purchase_old DROP CONSTRAINT purchase_pkey CASCADE")
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or "purchase" not in sa.inspect(bind).get_table_names():
+        # Fresh databases get the partitioned table from the models
+        return
+
+    op.create_table(
+        "purchase_payment",
+        sa.Column("transaction_id", sa.String(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("transaction_id"),
+    )
+    op.create_index("ix_purchase_payment_id", "purchase_payment", ["id"])
+    op.execute(
+        "INSERT INTO purchase_payment (transaction_id) "
+        "SELECT transaction_id FROM purchase WHERE transaction_id IS NOT NULL"
+    )
+
+    first = bind.scalar(sa.text("SELECT min(purchase_date) FROM purchase")) or datetime.utcnow()
+    swap_out_old_table()
+    create_purchase_table(
+        sa.PrimaryKeyConstraint("id", "purchase_date"),
+        postgresql_partition_by="RANGE (purchase_date)",
+    )
+    op.execute("CREATE TABLE purchase_default PARTITION OF purchase DEFAULT")
+    month = month_start(first)
+    last = month_start(datetime.utcnow(), MONTHS_AHEAD)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE purchase_y{month.year}m{month.month:02d} PARTITION OF purchase "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{month_start(month, 1):%Y-%m-%d}')"
+        )
+        month = month_start(month, 1)
+
+    op.execute(f"INSERT INTO purchase ({COLUMNS}) SELECT {COLUMNS} FROM purchase_old")
+    op.execute("ALTER SEQUENCE purchase_id_seq OWNED BY purchase.id")
+    op.drop_table("purchase_old")
+    create_indexes()
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or "purchase_payment" not in sa.inspect(bind).get_table_names():
+        return
+
+    swap_out_old_table()
+    create_purchase_table(sa.PrimaryKeyConstraint("id"))
+    op.execute(f"INSERT INTO purchase ({COLUMNS}) SELECT {COLUMNS} FROM purchase_old")
+    op.execute("ALTER SEQUENCE purchase_id_seq OWNED BY purchase.id")
+    # Dropping the parent drops every partition
+    op.drop_table("purchase_old")
+    create_indexes()
+    op.drop_index("ix_purchase_user_id_purchase_date", table_name="purchase")
+    op.drop_index("ix_purchase_transaction_id", table_name="purchase")
+    op.create_index("ix_purchase_transaction_id", "purchase", ["transaction_id"], unique=True)
+    op.drop_table("purchase_payment")
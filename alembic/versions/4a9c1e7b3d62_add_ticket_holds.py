@@ -0,0 +1,110 @@
+"""Add ticket holds
+
+Revision ID: 4a9c1e7b3d62
+Revises: 0b7d3e5a8c14
+Create Date: 2026-10-19 19:32:14.508317
+
+Adds raffle.tickets_held and the ticket_hold table, and includes
+tickets_held in the raffle_inventory notifications.
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "4a9c1e7b3d62"
+down_revision = "0b7d3e5a8c14"
+branch_labels = None
+depends_on = None
+
+NOTIFY_INVENTORY_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_raffle_inventory() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('raffle_inventory', json_build_object(
+        'raffle_id', NEW.id,
+        'tickets_sold', NEW.tickets_sold,
+        'tickets_held', NEW.tickets_held,
+        'total_tickets', NEW.total_tickets,
+        'is_active', NEW.is_active,
+        'winner_id', NEW.winner_id
+    )::text);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+NOTIFY_INVENTORY_TRIGGER = """
+CREATE TRIGGER raffle_inventory_notify
+AFTER UPDATE OF tickets_sold, tickets_held, total_tickets, is_active, winner_id ON raffle
+FOR EACH ROW
+WHEN (
+    (OLD.tickets_sold, OLD.tickets_held, OLD.total_tickets, OLD.is_active, OLD.winner_id)
+    IS DISTINCT FROM (NEW.tickets_sold, NEW.tickets_held, NEW.total_tickets, NEW.is_active, NEW.winner_id)
+)
+EXECUTE FUNCTION notify_raffle_inventory()
+"""
+
+PREVIOUS_NOTIFY_INVENTORY_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_raffle_inventory() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('raffle_inventory', json_build_object(
+        'raffle_id', NEW.id,
+        'tickets_sold', NEW.tickets_sold,
+        'total_tickets', NEW.total_tickets,
+        'is_active', NEW.is_active,
+        'winner_id', NEW.winner_id
+    )::text);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+PREVIOUS_NOTIFY_INVENTORY_TRIGGER = """
+CREATE TRIGGER raffle_inventory_notify
+AFTER UPDATE OF tickets_sold, total_tickets, is_active, winner_id ON raffle
+FOR EACH ROW
+WHEN (
+    (OLD.tickets_sold, OLD.total_tickets, OLD.is_active, OLD.winner_id)
+    IS DISTINCT FROM (NEW.tickets_sold, NEW.total_tickets, NEW.is_active, NEW.winner_id)
+)
+EXECUTE FUNCTION notify_raffle_inventory()
+"""
+
+
+def upgrade():
+    op.add_column(
+        "raffle",
+        sa.Column("tickets_held", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.create_table(
+        "ticket_hold",
+        sa.Column("raffle_id", sa.Integer(), sa.ForeignKey("raffle.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("payment_intent_id", sa.String(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("payment_intent_id"),
+    )
+    op.create_index("ix_ticket_hold_id", "ticket_hold", ["id"])
+    op.create_index("ix_ticket_hold_expires_at", "ticket_hold", ["expires_at"])
+
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS raffle_inventory_notify ON raffle")
+        op.execute(NOTIFY_INVENTORY_FUNCTION)
+        op.execute(NOTIFY_INVENTORY_TRIGGER)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS raffle_inventory_notify ON raffle")
+        op.execute(PREVIOUS_NOTIFY_INVENTORY_FUNCTION)
+        op.execute(PREVIOUS_NOTIFY_INVENTORY_TRIGGER)
+
+    op.drop_table("ticket_hold")
+    op.drop_column("raffle", "tickets_held")
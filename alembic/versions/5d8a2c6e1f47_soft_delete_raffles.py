@@ -0,0 +1,42 @@
+"""Soft delete raffles
+
+Revision ID: 5d8a2c6e1f47
+Revises: b6e48d2f7a51
+Create Date: 2026-10-19 23:12:40.518337
+
+Adds raffle.deleted_at, with partial indexes for listing live raffles and
+for finding deleted ones to purge.
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5d8a2c6e1f47"
+down_revision = "b6e48d2f7a51"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("raffle", sa.Column("deleted_at", sa.DateTime(), nullable=True))
+    op.create_index(
+        "ix_raffle_live_id",
+        "raffle",
+        ["id"],
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+    op.create_index(
+        "ix_raffle_deleted_at",
+        "raffle",
+        ["deleted_at"],
+        postgresql_where=sa.text("deleted_at IS NOT NULL"),
+    )
+
+
+def downgrade():
+    op.drop_index("ix_raffle_deleted_at", table_name="raffle")
+    op.drop_index("ix_raffle_live_id", table_name="raffle")
+    op.drop_column("raffle", "deleted_at")
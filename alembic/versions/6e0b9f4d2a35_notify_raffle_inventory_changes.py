@@ -0,0 +1,60 @@
+"""Notify raffle inventory changes
+
+Revision ID: 6e0b9f4d2a35
+Revises: d5a81c3e9f02
+Create Date: 2026-10-19 17:12:05.377812
+
+Adds a trigger that sends each change to a raffle's tickets_sold,
+total_tickets, is_active or winner_id to the raffle_inventory channel,
+where the workers' inventory listeners pick it up.
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "6e0b9f4d2a35"
+down_revision = "d5a81c3e9f02"
+branch_labels = None
+depends_on = None
+
+NOTIFY_INVENTORY_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_raffle_inventory() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('raffle_inventory', json_build_object(
+        'raffle_id', NEW.id,
+        'tickets_sold', NEW.tickets_sold,
+        'total_tickets', NEW.total_tickets,
+        'is_active', NEW.is_active,
+        'winner_id', NEW.winner_id
+    )::text);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+NOTIFY_INVENTORY_TRIGGER = """
+CREATE TRIGGER raffle_inventory_notify
+AFTER UPDATE OF tickets_sold, total_tickets, is_active, winner_id ON raffle
+FOR EACH ROW
+WHEN (
+    (OLD.tickets_sold, OLD.total_tickets, OLD.is_active, OLD.winner_id)
+    IS DISTINCT FROM (NEW.tickets_sold, NEW.total_tickets, NEW.is_active, NEW.winner_id)
+)
+EXECUTE FUNCTION notify_raffle_inventory()
+"""
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(NOTIFY_INVENTORY_FUNCTION)
+    op.execute(NOTIFY_INVENTORY_TRIGGER)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP TRIGGER IF EXISTS raffle_inventory_notify ON raffle")
+    op.execute("DROP FUNCTION IF EXISTS notify_raffle_inventory()")
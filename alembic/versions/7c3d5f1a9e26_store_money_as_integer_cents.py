@@ -0,0 +1,57 @@
+"""Store money as integer cents
+
+Revision ID: 7c3d5f1a9e26
+Revises: e2f7a4c9b813
+Create Date: 2026-10-19 20:48:22.637051
+
+Turns every money column from numeric currency units into bigint cents,
+renamed with a _cents suffix. Amounts with fractions of a cent (none are
+written by the app) are rounded.
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "7c3d5f1a9e26"
+down_revision = "e2f7a4c9b813"
+branch_labels = None
+depends_on = None
+
+# table, column, numeric type
+MONEY_COLUMNS = [
+    ("raffle", "ticket_price", sa.Numeric(10, 2)),
+    ("purchase", "total_amount", sa.Numeric(10, 2)),
+    ("raffle_hourly_stats", "revenue", sa.Numeric(14, 2)),
+    ("raffle_stats", "revenue", sa.Numeric(14, 2)),
+    ("archived_raffle", "ticket_price", sa.Numeric(10, 2)),
+    ("archived_participation", "amount", sa.Numeric(12, 2)),
+]
+
+
+def upgrade():
+    for table, column, numeric in MONEY_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.BigInteger(),
+            existing_type=numeric,
+            existing_nullable=False,
+            postgresql_using=f"round({column} * 100)::bigint",
+        )
+        op.alter_column(table, column, new_column_name=f"{column}_cents")
+
+
+def downgrade():
+    for table, column, numeric in MONEY_COLUMNS:
+        op.alter_column(table, f"{column}_cents", new_column_name=column)
+        op.alter_column(
+            table,
+            column,
+            type_=numeric,
+            existing_type=sa.BigInteger(),
+            existing_nullable=False,
+            postgresql_using=f"{column} / 100.0",
+        )
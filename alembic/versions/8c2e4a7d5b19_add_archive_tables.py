@@ -0,0 +1,62 @@
+"""Add archive tables
+
+Revision ID: 8c2e4a7d5b19
+Revises: 3f6b2d9c41a7
+Create Date: 2026-10-19 14:21:36.504118
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8c2e4a7d5b19"
+down_revision = "3f6b2d9c41a7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "archived_raffle",
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("ticket_price", sa.Numeric(10, 2), nullable=False),
+        sa.Column("total_tickets", sa.Integer(), nullable=False),
+        sa.Column("tickets_sold", sa.Integer(), nullable=False),
+        sa.Column("start_date", sa.DateTime(), nullable=False),
+        sa.Column("end_date", sa.DateTime(), nullable=False),
+        sa.Column("winner_id", sa.Integer(), nullable=True),
+        sa.Column("purchase_count", sa.Integer(), nullable=False),
+        sa.Column("location", sa.String(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_archived_raffle_id", "archived_raffle", ["id"])
+    op.create_index("ix_archived_raffle_winner_id", "archived_raffle", ["winner_id"])
+    op.create_table(
+        "archived_participation",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("raffle_id", sa.Integer(), sa.ForeignKey("archived_raffle.id"), nullable=False),
+        sa.Column("purchases", sa.Integer(), nullable=False),
+        sa.Column("tickets", sa.Integer(), nullable=False),
+        sa.Column("amount", sa.Numeric(12, 2), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_archived_participation_id", "archived_participation", ["id"])
+    op.create_index(
+        "ix_archived_participation_user_id_raffle_id",
+        "archived_participation",
+        ["user_id", "raffle_id"],
+        unique=True,
+    )
+
+
+def downgrade():
+    op.drop_table("archived_participation")
+    op.drop_table("archived_raffle")
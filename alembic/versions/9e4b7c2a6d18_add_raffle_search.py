@@ -0,0 +1,57 @@
+"""Add raffle search
+
+Revision ID: 9e4b7c2a6d18
+Revises: 5d8a2c6e1f47
+Create Date: 2026-10-20 00:41:17.302965
+
+Adds the generated raffle.search_vector with a GIN index over open
+raffles, and extends ix_raffle_active_end_date with id so search pages
+in end_date order seek straight to their start. Adding the stored column
+rewrites raffle.
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9e4b7c2a6d18"
+down_revision = "5d8a2c6e1f47"
+branch_labels = None
+depends_on = None
+
+ADD_SEARCH_VECTOR = """
+ALTER TABLE raffle ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'B')
+) STORED
+"""
+
+CREATE_SEARCH_INDEX = """
+CREATE INDEX ix_raffle_search_vector ON raffle USING gin (search_vector) WHERE is_active
+"""
+
+
+def upgrade():
+    op.execute(ADD_SEARCH_VECTOR)
+    op.execute(CREATE_SEARCH_INDEX)
+    op.drop_index("ix_raffle_active_end_date", table_name="raffle")
+    op.create_index(
+        "ix_raffle_active_end_date",
+        "raffle",
+        ["end_date", "id"],
+        postgresql_where=sa.text("is_active"),
+    )
+
+
+def downgrade():
+    op.drop_index("ix_raffle_active_end_date", table_name="raffle")
+    op.create_index(
+        "ix_raffle_active_end_date",
+        "raffle",
+        ["end_date"],
+        postgresql_where=sa.text("is_active"),
+    )
+    op.drop_index("ix_raffle_search_vector", table_name="raffle")
+    op.drop_column("raffle", "search_vector")
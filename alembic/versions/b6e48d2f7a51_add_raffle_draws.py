@@ -0,0 +1,74 @@
+"""Add raffle draws
+
+Revision ID: b6e48d2f7a51
+Revises: 7c3d5f1a9e26
+Create Date: 2026-10-19 21:26:09.842715
+
+Adds raffle_draw and commits a seed for every raffle still without a
+winner. Adds the purchase index the draw reads tickets in canonical order
+from.
+
+"""
+
+import hashlib
+import secrets
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b6e48d2f7a51"
+down_revision = "7c3d5f1a9e26"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    raffle_draw = op.create_table(
+        "raffle_draw",
+        sa.Column("raffle_id", sa.Integer(), nullable=False),
+        sa.Column("seed", sa.String(length=64), nullable=False),
+        sa.Column("seed_hash", sa.String(length=64), nullable=False),
+        sa.Column("committed_at", sa.DateTime(), nullable=False),
+        sa.Column("revealed_at", sa.DateTime(), nullable=True),
+        sa.Column("purchase_count", sa.Integer(), nullable=True),
+        sa.Column("total_tickets", sa.Integer(), nullable=True),
+        sa.Column("tickets_digest", sa.String(length=64), nullable=True),
+        sa.Column("winning_ticket", sa.Integer(), nullable=True),
+        sa.Column("winning_purchase_id", sa.Integer(), nullable=True),
+        sa.Column("winner_id", sa.Integer(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("raffle_id"),
+    )
+    op.create_index("ix_raffle_draw_id", "raffle_draw", ["id"])
+    # Canonical ticket order; also serves raffle purchase exports
+    op.create_index(
+        "ix_purchase_raffle_id_purchase_date_id",
+        "purchase",
+        ["raffle_id", "purchase_date", "id"],
+        postgresql_include=["user_id", "quantity"],
+    )
+
+    now = datetime.utcnow()
+    raffle_ids = op.get_bind().execute(sa.text("SELECT id FROM raffle WHERE winner_id IS NULL")).scalars().all()
+    seeds = [secrets.token_hex(32) for _ in raffle_ids]
+    if raffle_ids:
+        op.bulk_insert(raffle_draw, [
+            {
+                "raffle_id": raffle_id,
+                "seed": seed,
+                "seed_hash": hashlib.sha256(bytes.fromhex(seed)).hexdigest(),
+                "committed_at": now,
+            }
+            for raffle_id, seed in zip(raffle_ids, seeds)
+        ])
+
+
+def downgrade():
+    op.drop_index("ix_purchase_raffle_id_purchase_date_id", table_name="purchase")
+    op.drop_table("raffle_draw")
@@ -0,0 +1,64 @@
+"""Add analytics rollups
+
+Revision ID: d5a81c3e9f02
+Revises: 8c2e4a7d5b19
+Create Date: 2026-10-19 16:02:48.913275
+
+The rollups start empty; the first refresh after startup backfills them
+from the whole purchase table.
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d5a81c3e9f02"
+down_revision = "8c2e4a7d5b19"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "raffle_hourly_stats",
+        sa.Column("raffle_id", sa.Integer(), nullable=False),
+        sa.Column("hour", sa.DateTime(), nullable=False),
+        sa.Column("purchases", sa.Integer(), nullable=False),
+        sa.Column("tickets", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Numeric(14, 2), nullable=False),
+        sa.Column("buyers", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_raffle_hourly_stats_id", "raffle_hourly_stats", ["id"])
+    op.create_index(
+        "ix_raffle_hourly_stats_raffle_id_hour",
+        "raffle_hourly_stats",
+        ["raffle_id", "hour"],
+        unique=True,
+    )
+    op.create_index("ix_raffle_hourly_stats_hour", "raffle_hourly_stats", ["hour"])
+    op.create_table(
+        "raffle_stats",
+        sa.Column("raffle_id", sa.Integer(), nullable=False),
+        sa.Column("purchases", sa.Integer(), nullable=False),
+        sa.Column("tickets", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Numeric(14, 2), nullable=False),
+        sa.Column("buyers", sa.Integer(), nullable=False),
+        sa.Column("last_purchase_at", sa.DateTime(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("raffle_id"),
+    )
+    op.create_index("ix_raffle_stats_id", "raffle_stats", ["id"])
+
+
+def downgrade():
+    op.drop_table("raffle_stats")
+    op.drop_table("raffle_hourly_stats")
@@ -0,0 +1,31 @@
+"""Hold several raffles per payment intent
+
+Revision ID: e2f7a4c9b813
+Revises: 4a9c1e7b3d62
+Create Date: 2026-10-19 20:05:37.114902
+
+A batch checkout holds tickets of several raffles under one payment
+intent, so ticket holds are unique per payment intent and raffle.
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "e2f7a4c9b813"
+down_revision = "4a9c1e7b3d62"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_constraint("ticket_hold_payment_intent_id_key", "ticket_hold", type_="unique")
+    op.create_unique_constraint(
+        "ticket_hold_payment_intent_id_raffle_id_key", "ticket_hold", ["payment_intent_id", "raffle_id"]
+    )
+
+
+def downgrade():
+    op.drop_constraint("ticket_hold_payment_intent_id_raffle_id_key", "ticket_hold", type_="unique")
+    op.create_unique_constraint("ticket_hold_payment_intent_id_key", "ticket_hold", ["payment_intent_id"])
@@ -0,0 +1,71 @@
+"""Add query indexes
+
+Revision ID: ec1edf68eefe
+Revises: a93912db6b09
+Create Date: 2026-10-19 09:12:41.503118
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "ec1edf68eefe"
+down_revision = "a93912db6b09"
+branch_labels = None
+depends_on = None
+
+
+# name, table, columns, extra create_index kwargs
+INDEXES = [
+    # list_user_purchases, get_profile_stats, get_user_raffles,
+    # list_raffle_purchases: index-only for the stats aggregates
+    (
+        "ix_purchase_user_id_raffle_id",
+        "purchase",
+        ["user_id", "raffle_id"],
+        {"postgresql_include": ["quantity", "total_amount"]},
+    ),
+    # select_winner, check_ending_soon
+    ("ix_purchase_raffle_id_user_id", "purchase", ["raffle_id", "user_id"], {}),
+    # get_profile_stats (raffles won)
+    ("ix_raffle_winner_id", "raffle", ["winner_id"], {}),
+    # list_raffles(active_only), ending-soon checks
+    (
+        "ix_raffle_active_end_date",
+        "raffle",
+        ["end_date"],
+        {"postgresql_where": sa.text("is_active")},
+    ),
+]
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    # CONCURRENTLY can't run inside a transaction, but avoids locking
+    # writes on purchase while the index builds
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in INDEXES:
+            # Fresh databases get these from the models on autogenerate
+            if table not in existing:
+                continue
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+                **kwargs,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.endpoints import auth, raffle, purchase, profile, payment
+from app.api.endpoints import admin, auth, raffle, purchase, profile, payment, waiting_room
 
 api_router = APIRouter()
 
@@ -8,3 +8,5 @@ api_router.include_router(raffle.router, prefix="/raffles", tags=["raffles"])
 api_router.include_router(purchase.router, prefix="/purchases", tags=["purchases"])
 api_router.include_router(profile.router, prefix="/profile", tags=["profile"])
 api_router.include_router(payment.router, prefix="/payments", tags=["payments"])
+api_router.include_router(waiting_room.router, prefix="/waiting-room", tags=["waiting room"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
@@ -0,0 +1,69 @@
+import math
+from typing import Annotated, Any, Dict, List, Optional
+from fastapi import Depends, Header, HTTPException, Request, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+
+from app.api.dependencies.auth import get_current_active_user
+from app.core.metrics import metrics
+from app.services.admission import admission_control
+
+# Validates raffle ids as the body models will, so "2" is gated like 2
+RAFFLE_ID = TypeAdapter(int)
+
+async def checkout_raffle_ids(request: Request) -> List[int]:
+    """
+    The raffle ids a checkout body names, as its body model will read them.
+    Raises 422 for a body that isn't JSON or names an invalid raffle id.
+    """
+    try:
+        body = await request.json()
+        raffle_ids = [body.get("raffle_id")]
+        if "items" in body:
+            raffle_ids = [item.get("raffle_id") for item in body["items"]]
+        return [RAFFLE_ID.validate_python(raffle_id) for raffle_id in raffle_ids]
+    except (ValueError, TypeError, AttributeError, ValidationError):
+        # json.JSONDecodeError and pydantic's ValidationError are ValueErrors too
+        raise RequestValidationError(
+            [{"type": "value_error", "loc": ("body", "raffle_id"), "msg": "Invalid raffle_id", "input": None}]
+        )
+
+async def require_admission(
+    request: Request,
+    current_user: Annotated[Dict[str, Any], Depends(get_current_active_user)],
+    x_admission_token: Annotated[Optional[str], Header()] = None
+) -> None:
+    """
+    Let checkout requests through only once the caller has been admitted
+    from the waiting room of each raffle checked out (the body's raffle_id,
+    or its items' raffle_ids) that has one. A batch checkout sends one
+    token per such raffle, comma-separated. Checked from the tokens alone,
+    without touching the database.
+    """
+    raffle_ids = await checkout_raffle_ids(request)
+    gated = [raffle_id for raffle_id in raffle_ids if admission_control.rate(raffle_id) is not None]
+    if not gated:
+        return
+
+    tokens = {}
+    for token in (x_admission_token or "").split(","):
+        claims = admission_control.read_token(token.strip()) if token.strip() else None
+        if claims and claims["sub"] == str(current_user['id']):
+            tokens[claims["raffle_id"]] = claims
+    for raffle_id in gated:
+        claims = tokens.get(raffle_id)
+        if not claims:
+            metrics.increment("admission.rejected")
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Join the raffle's waiting room first"
+            )
+        queue_status = admission_control.status(claims)
+        if not queue_status["admitted"]:
+            metrics.increment("admission.rejected")
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=queue_status,
+                headers={"Retry-After": str(math.ceil(queue_status["wait_seconds"]))}
+            )
+    metrics.increment("admission.admitted")
@@ -4,7 +4,7 @@ from fastapi.security import OAuth2PasswordBearer
 from postgrest.exceptions import APIError
 
 from app.core.config import settings
-from app.core.supabase import supabase
+from app.core.supabase import supabase, supabase_dependency
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
@@ -19,12 +19,17 @@ async def get_current_user(
     
     try:
         # Verify token with Supabase
-        user = supabase.auth.get_user(token)
+        user = await supabase_dependency.call(
+            supabase.auth.get_user, token, idempotent=True
+        )
         if not user:
             raise credentials_exception
             
         # Get user data from Supabase database
-        response = supabase.table('users').select("*").eq('id', user.user.id).execute()
+        response = await supabase_dependency.call(
+            supabase.table('users').select("*").eq('id', user.user.id).execute,
+            idempotent=True
+        )
         if not response.data:
             raise credentials_exception
             
@@ -0,0 +1,264 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.dependencies.auth import get_current_active_superuser
+from app.core.database import get_db, get_read_db, get_stream_db
+from app.models.schemas.analytics import Analytics
+from app.models.schemas.waiting_room import WaitingRoom, WaitingRoomUpdate
+from app.models.domain.analytics import RaffleHourlyStats, RaffleStats
+from app.models.domain.archive import ArchivedRaffle
+from app.models.domain.purchase import Purchase as PurchaseModel
+from app.models.domain.raffle import Raffle as RaffleModel
+from app.models.domain.waiting_room import WaitingRoom as WaitingRoomModel
+from app.services.admission import admission_control
+from app.services.exports import MEDIA_TYPES, ExportFormat, stream_export
+
+router = APIRouter()
+
+PURCHASE_COLUMNS = (
+    PurchaseModel.id,
+    PurchaseModel.user_id,
+    PurchaseModel.raffle_id,
+    PurchaseModel.quantity,
+    PurchaseModel.total_amount_cents,
+    PurchaseModel.transaction_id,
+    PurchaseModel.purchase_date,
+)
+RAFFLE_COLUMNS = (
+    RaffleModel.id,
+    RaffleModel.title,
+    RaffleModel.ticket_price_cents,
+    RaffleModel.total_tickets,
+    RaffleModel.tickets_sold,
+    RaffleModel.start_date,
+    RaffleModel.end_date,
+    RaffleModel.is_active,
+    RaffleModel.winner_id,
+)
+
+def export_response(
+    request: Request,
+    db: AsyncSession,
+    query: Select,
+    file_format: ExportFormat,
+    filename: str
+) -> StreamingResponse:
+    """Stream query as a download, gzipped when the client accepts it."""
+    compress = "gzip" in request.headers.get("accept-encoding", "")
+    headers = {"Content-Disposition": f'attachment; filename="{filename}.{file_format.value}"'}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+    return StreamingResponse(
+        stream_export(db, query, file_format, compress),
+        media_type=MEDIA_TYPES[file_format],
+        headers=headers
+    )
+
+@router.get("/exports/raffles")
+async def export_raffles(
+    *,
+    request: Request,
+    db: AsyncSession = Depends(get_stream_db),
+    current_user: dict = Depends(get_current_active_superuser),
+    format: ExportFormat = ExportFormat.CSV
+) -> StreamingResponse:
+    """
+    Export every raffle.
+    Only superusers can export.
+    """
+    query = select(*RAFFLE_COLUMNS).where(RaffleModel.deleted_at.is_(None)).order_by(RaffleModel.id)
+    return export_response(request, db, query, format, "raffles")
+
+@router.get("/exports/raffles/{raffle_id}/purchases")
+async def export_raffle_purchases(
+    *,
+    request: Request,
+    db: AsyncSession = Depends(get_stream_db),
+    current_user: dict = Depends(get_current_active_superuser),
+    raffle_id: int,
+    format: ExportFormat = ExportFormat.CSV
+) -> StreamingResponse:
+    """
+    Export all purchases of a raffle, oldest first.
+    Only superusers can export.
+    """
+    raffle = await db.get(RaffleModel, raffle_id)
+    if not raffle or raffle.deleted_at:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Raffle not found"
+        )
+    query = (
+        select(*PURCHASE_COLUMNS)
+        .where(PurchaseModel.in_raffle(raffle_id))
+        .order_by(PurchaseModel.purchase_date, PurchaseModel.id)
+    )
+    return export_response(request, db, query, format, f"raffle_{raffle_id}_purchases")
+
+@router.get("/exports/purchases")
+async def export_purchases(
+    *,
+    request: Request,
+    db: AsyncSession = Depends(get_stream_db),
+    current_user: dict = Depends(get_current_active_superuser),
+    start: datetime,
+    end: datetime,
+    format: ExportFormat = ExportFormat.CSV
+) -> StreamingResponse:
+    """
+    Export all purchases made from start up to end, oldest first.
+    Only superusers can export.
+    """
+    if end <= start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end must be after start"
+        )
+    query = (
+        select(*PURCHASE_COLUMNS)
+        # Bounds purchase_date, so only the matching partitions are read
+        .where(PurchaseModel.purchase_date >= start, PurchaseModel.purchase_date < end)
+        .order_by(PurchaseModel.purchase_date, PurchaseModel.id)
+    )
+    filename = f"purchases_{start:%Y%m%d}_{end:%Y%m%d}"
+    return export_response(request, db, query, format, filename)
+
+@router.get("/analytics", response_model=Analytics)
+async def get_analytics(
+    *,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_active_superuser),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    raffle_id: Optional[int] = None,
+    limit: int = 10
+) -> Dict[str, Any]:
+    """
+    Purchases, tickets and revenue per hour, and the top raffles by revenue,
+    from start (default: 24 hours before end) up to end (default: now).
+    Read from the rollups, which trail purchases by up to
+    ROLLUP_REFRESH_INTERVAL seconds.
+    Only superusers can view analytics.
+    """
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(hours=24)
+    window = [
+        RaffleHourlyStats.hour >= start.replace(minute=0, second=0, microsecond=0),
+        RaffleHourlyStats.hour < end,
+    ]
+    if raffle_id is not None:
+        window.append(RaffleHourlyStats.raffle_id == raffle_id)
+
+    hourly_result = await db.execute(
+        select(
+            RaffleHourlyStats.hour,
+            func.sum(RaffleHourlyStats.purchases).label("purchases"),
+            func.sum(RaffleHourlyStats.tickets).label("tickets"),
+            func.sum(RaffleHourlyStats.revenue_cents).label("revenue_cents"),
+            func.sum(RaffleHourlyStats.buyers).label("buyers"),
+        )
+        .where(*window)
+        .group_by(RaffleHourlyStats.hour)
+        .order_by(RaffleHourlyStats.hour)
+    )
+    hourly = [
+        # A buyer of several raffles in one hour would be counted once per raffle
+        {**row._asdict(), "buyers": row.buyers if raffle_id is not None else None}
+        for row in hourly_result
+    ]
+
+    revenue = func.sum(RaffleHourlyStats.revenue_cents).label("revenue_cents")
+    top = (
+        select(
+            RaffleHourlyStats.raffle_id,
+            func.sum(RaffleHourlyStats.purchases).label("purchases"),
+            func.sum(RaffleHourlyStats.tickets).label("tickets"),
+            revenue,
+        )
+        .where(*window)
+        .group_by(RaffleHourlyStats.raffle_id)
+        .order_by(revenue.desc())
+        .limit(limit)
+        .subquery()
+    )
+    # Archived raffles are gone from raffle but keep their rollups
+    tickets_sold = func.coalesce(RaffleModel.tickets_sold, ArchivedRaffle.tickets_sold)
+    total_tickets = func.coalesce(RaffleModel.total_tickets, ArchivedRaffle.total_tickets)
+    raffles_result = await db.execute(
+        select(
+            top,
+            func.coalesce(RaffleModel.title, ArchivedRaffle.title).label("title"),
+            RaffleStats.buyers.label("lifetime_buyers"),
+            tickets_sold.label("tickets_sold"),
+            total_tickets.label("total_tickets"),
+        )
+        .outerjoin(RaffleModel, RaffleModel.id == top.c.raffle_id)
+        .outerjoin(ArchivedRaffle, ArchivedRaffle.id == top.c.raffle_id)
+        .outerjoin(RaffleStats, RaffleStats.raffle_id == top.c.raffle_id)
+        .order_by(top.c.revenue_cents.desc())
+    )
+    raffles = [
+        {
+            **row._asdict(),
+            "sell_through": row.tickets_sold / row.total_tickets if row.total_tickets else None
+        }
+        for row in raffles_result
+    ]
+
+    return {
+        "start": start,
+        "end": end,
+        "totals": {
+            "purchases": sum(point["purchases"] for point in hourly),
+            "tickets": sum(point["tickets"] for point in hourly),
+            "revenue_cents": sum(point["revenue_cents"] for point in hourly),
+        },
+        "hourly": hourly,
+        "raffles": raffles,
+    }
+
+@router.put("/raffles/{raffle_id}/waiting-room", response_model=WaitingRoom)
+async def set_waiting_room(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_active_superuser),
+    raffle_id: int,
+    waiting_room_in: WaitingRoomUpdate
+) -> WaitingRoomModel:
+    """
+    Put a raffle's checkout behind a waiting room admitting rate users per
+    second, or change the rate. Every worker enforces it within
+    ADMISSION_REFRESH_INTERVAL seconds.
+    """
+    raffle = await db.get(RaffleModel, raffle_id)
+    if not raffle or raffle.deleted_at:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Raffle not found"
+        )
+    waiting_room = await db.scalar(select(WaitingRoomModel).where(WaitingRoomModel.raffle_id == raffle_id))
+    if waiting_room:
+        waiting_room.rate = waiting_room_in.rate
+    else:
+        waiting_room = WaitingRoomModel(raffle_id=raffle_id, rate=waiting_room_in.rate)
+        db.add(waiting_room)
+    await db.commit()
+    admission_control.rates[raffle_id] = waiting_room.rate
+    return waiting_room
+
+@router.delete("/raffles/{raffle_id}/waiting-room", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_waiting_room(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_active_superuser),
+    raffle_id: int
+) -> None:
+    """Open a raffle's checkout to everyone again."""
+    await db.execute(delete(WaitingRoomModel).where(WaitingRoomModel.raffle_id == raffle_id))
+    await db.commit()
+    admission_control.rates.pop(raffle_id, None)
@@ -3,7 +3,7 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordRequestForm
 from postgrest.exceptions import APIError
 
-from app.core.supabase import supabase
+from app.core.supabase import supabase, supabase_dependency
 from app.models.schemas.user import UserCreate, Token, User as UserSchema
 from app.services.notifications import notification_service
 from app.services.notification_templates import NotificationTemplate
@@ -13,10 +13,13 @@ router = APIRouter()
 @router.post("/login", response_model=Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends()) -> Dict[str, str]:
     try:
-        response = supabase.auth.sign_in_with_password({
-            "email": form_data.username,
-            "password": form_data.password
-        })
+        response = await supabase_dependency.call(
+            supabase.auth.sign_in_with_password,
+            {
+                "email": form_data.username,
+                "password": form_data.password
+            }
+        )
         return {"access_token": response.session.access_token}
     except APIError as e:
         raise HTTPException(
@@ -29,10 +32,13 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()) -> Dict[str, s
 async def register(user_in: UserCreate) -> Dict[str, Any]:
     try:
         # Register user in Supabase Auth
-        auth_response = supabase.auth.sign_up({
-            "email": user_in.email,
-            "password": user_in.password
-        })
+        auth_response = await supabase_dependency.call(
+            supabase.auth.sign_up,
+            {
+                "email": user_in.email,
+                "password": user_in.password
+            }
+        )
         
         # Store additional user data in Supabase database
         user_data = {
@@ -44,7 +50,9 @@ async def register(user_in: UserCreate) -> Dict[str, Any]:
             "is_superuser": False
         }
         
-        data = supabase.table('users').insert(user_data).execute()
+        data = await supabase_dependency.call(
+            supabase.table('users').insert(user_data).execute
+        )
         
         # Register user in Novu and send welcome notification
         await notification_service.register_subscriber(
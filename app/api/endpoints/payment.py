@@ -2,11 +2,14 @@ from typing import Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.dependencies.admission import require_admission
 from app.api.dependencies.auth import get_current_active_user
 from app.core.database import get_db
 from app.core.config import settings
-from app.services.payments import payment_service
+from app.services.holds import NOT_ENOUGH_TICKETS, has_tickets_left, load_checkout_raffles, reserve_tickets
+from app.services.payments import items_metadata, payment_service
 from app.models.schemas.payment import (
+    PaymentBatchIntentCreate,
     PaymentIntentCreate,
     PaymentIntentResponse,
     PaymentConfirmation,
@@ -18,7 +21,11 @@ from app.models.domain.raffle import Raffle as RaffleModel
 
 router = APIRouter()
 
-@router.post("/create-intent", response_model=PaymentIntentResponse)
+@router.post(
+    "/create-intent",
+    response_model=PaymentIntentResponse,
+    dependencies=[Depends(require_admission)]
+)
 async def create_payment_intent(
     *,
     db: AsyncSession = Depends(get_db),
@@ -27,10 +34,12 @@ async def create_payment_intent(
 ) -> Dict[str, Any]:
     """
     Create a payment intent for purchasing raffle tickets.
+    The tickets are held for the intent until hold_expires_at; paying for
+    them with a purchase before then can't fail for lack of tickets.
     """
     # Get raffle to calculate amount
     raffle = await db.get(RaffleModel, payment_data.raffle_id)
-    if not raffle:
+    if not raffle or raffle.deleted_at:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Raffle not found"
@@ -42,12 +51,20 @@ async def create_payment_intent(
             detail="Raffle is not active"
         )
     
+    # Turn away sold-out raffles before creating an intent; the hold below
+    # makes the final check
+    if not has_tickets_left(raffle, payment_data.quantity):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=NOT_ENOUGH_TICKETS
+        )
+    
     # Calculate total amount
-    total_amount = float(raffle.ticket_price) * payment_data.quantity
+    total_amount_cents = raffle.ticket_price_cents * payment_data.quantity
     
     # Create payment intent
     payment_intent = await payment_service.create_payment_intent(
-        amount=total_amount,
+        amount_cents=total_amount_cents,
         currency=settings.STRIPE_CURRENCY,
         metadata={
             "user_id": current_user['id'],
@@ -56,11 +73,71 @@ async def create_payment_intent(
         }
     )
     
+    hold_expires_at = await reserve_tickets(
+        db,
+        user_id=current_user['id'],
+        quantities={payment_data.raffle_id: payment_data.quantity},
+        payment_intent_id=payment_intent["payment_intent_id"]
+    )
+    await db.commit()
+    
+    return {
+        "client_secret": payment_intent["client_secret"],
+        "payment_intent_id": payment_intent["payment_intent_id"],
+        "amount_cents": total_amount_cents,
+        "currency": settings.STRIPE_CURRENCY,
+        "hold_expires_at": hold_expires_at
+    }
+
+@router.post(
+    "/create-batch-intent",
+    response_model=PaymentIntentResponse,
+    dependencies=[Depends(require_admission)]
+)
+async def create_batch_payment_intent(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user),
+    payment_data: PaymentBatchIntentCreate
+) -> Dict[str, Any]:
+    """
+    Create one payment intent for tickets of several raffles, holding all
+    of them until hold_expires_at. Pay with a single batch purchase.
+    """
+    quantities = {item.raffle_id: item.quantity for item in payment_data.items}
+    raffles = await load_checkout_raffles(db, quantities)
+    if not all(has_tickets_left(raffles[raffle_id], quantity) for raffle_id, quantity in quantities.items()):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=NOT_ENOUGH_TICKETS
+        )
+    
+    total_amount_cents = sum(
+        raffles[raffle_id].ticket_price_cents * quantity for raffle_id, quantity in quantities.items()
+    )
+    payment_intent = await payment_service.create_payment_intent(
+        amount_cents=total_amount_cents,
+        currency=settings.STRIPE_CURRENCY,
+        metadata={
+            "user_id": current_user['id'],
+            "items": items_metadata(quantities)
+        }
+    )
+    
+    hold_expires_at = await reserve_tickets(
+        db,
+        user_id=current_user['id'],
+        quantities=quantities,
+        payment_intent_id=payment_intent["payment_intent_id"]
+    )
+    await db.commit()
+    
     return {
         "client_secret": payment_intent["client_secret"],
         "payment_intent_id": payment_intent["payment_intent_id"],
-        "amount": total_amount,
-        "currency": settings.STRIPE_CURRENCY
+        "amount_cents": total_amount_cents,
+        "currency": settings.STRIPE_CURRENCY,
+        "hold_expires_at": hold_expires_at
     }
 
 @router.post("/confirm", response_model=Dict[str, bool])
@@ -72,10 +149,10 @@ async def confirm_payment(
     """
     Confirm a payment was successful.
     """
-    is_confirmed = await payment_service.confirm_payment(
+    intent = await payment_service.confirm_payment(
         confirmation.payment_intent_id
     )
-    return {"confirmed": is_confirmed}
+    return {"confirmed": intent is not None}
 
 @router.post("/refund", response_model=PaymentRefundResponse)
 async def refund_payment(
@@ -95,7 +172,7 @@ async def refund_payment(
     
     return await payment_service.refund_payment(
         payment_intent_id=refund_data.payment_intent_id,
-        amount=refund_data.amount
+        amount_cents=refund_data.amount_cents
     )
 
 @router.post("/webhook", response_model=WebhookEvent)
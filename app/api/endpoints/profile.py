@@ -4,11 +4,13 @@ from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies.auth import get_current_active_user
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.models.schemas.user import UserUpdate
+from app.models.domain.archive import ArchivedParticipation, ArchivedRaffle
 from app.models.domain.purchase import Purchase
 from app.models.domain.raffle import Raffle
-from app.core.supabase import supabase
+from app.core.resilience import DependencyUnavailableError
+from app.core.supabase import supabase, supabase_dependency
 
 router = APIRouter()
 
@@ -33,13 +35,15 @@ async def update_profile(
     try:
         # Update user data in Supabase
         update_data = user_update.model_dump(exclude_unset=True)
-        response = (
+        query = (
             supabase.table('users')
             .update(update_data)
             .eq('id', current_user['id'])
-            .execute()
         )
+        response = await supabase_dependency.call(query.execute, idempotent=True)
         return response.data[0]
+    except DependencyUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -49,7 +53,7 @@ async def update_profile(
 @router.get("/me/stats")
 async def get_profile_stats(
     *,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_active_user)
 ) -> Dict[str, Any]:
     """
@@ -60,42 +64,47 @@ async def get_profile_stats(
     - Number of raffles participated in
     - Number of raffles won
     """
-    # Get purchase stats
+    # Get purchase stats, raffles participated in and raffles won in one read
     purchase_stats = await db.execute(
         select(
             func.count(Purchase.id).label('total_purchases'),
             func.sum(Purchase.quantity).label('total_tickets'),
-            func.sum(Purchase.total_amount).label('total_spent')
+            func.sum(Purchase.total_amount_cents).label('total_spent_cents'),
+            func.count(func.distinct(Purchase.raffle_id)).label('raffles_participated'),
+            select(func.count(Raffle.id))
+            .where(Raffle.winner_id == current_user['id'], Raffle.deleted_at.is_(None))
+            .scalar_subquery()
+            .label('raffles_won')
         ).where(Purchase.user_id == current_user['id'])
     )
     stats = purchase_stats.first()
 
-    # Get number of unique raffles participated in
-    unique_raffles = await db.execute(
-        select(func.count(func.distinct(Purchase.raffle_id)))
-        .where(Purchase.user_id == current_user['id'])
-    )
-    raffles_count = unique_raffles.scalar()
-
-    # Get number of raffles won
-    won_raffles = await db.execute(
-        select(func.count(Raffle.id))
-        .where(Raffle.winner_id == current_user['id'])
+    # Add totals of archived raffles, whose purchases left the purchase table
+    archived_stats = await db.execute(
+        select(
+            func.sum(ArchivedParticipation.purchases),
+            func.sum(ArchivedParticipation.tickets),
+            func.sum(ArchivedParticipation.amount_cents),
+            func.count(ArchivedParticipation.raffle_id),
+            select(func.count(ArchivedRaffle.id))
+            .where(ArchivedRaffle.winner_id == current_user['id'])
+            .scalar_subquery()
+        ).where(ArchivedParticipation.user_id == current_user['id'])
     )
-    won_count = won_raffles.scalar()
+    archived = archived_stats.first()
 
     return {
-        "total_purchases": stats[0] or 0,
-        "total_tickets": stats[1] or 0,
-        "total_spent": float(stats[2] or 0),
-        "raffles_participated": raffles_count or 0,
-        "raffles_won": won_count or 0
+        "total_purchases": (stats[0] or 0) + (archived[0] or 0),
+        "total_tickets": (stats[1] or 0) + (archived[1] or 0),
+        "total_spent_cents": int((stats[2] or 0) + (archived[2] or 0)),
+        "raffles_participated": (stats[3] or 0) + archived[3],
+        "raffles_won": (stats[4] or 0) + archived[4]
     }
 
 @router.get("/me/raffles")
 async def get_user_raffles(
     *,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_active_user),
     skip: int = 0,
     limit: int = 100
@@ -109,10 +118,10 @@ async def get_user_raffles(
         select(
             Raffle,
             func.sum(Purchase.quantity).label('tickets_bought'),
-            func.sum(Purchase.total_amount).label('amount_spent')
+            func.sum(Purchase.total_amount_cents).label('amount_spent_cents')
         )
         .join(Purchase, Purchase.raffle_id == Raffle.id)
-        .where(Purchase.user_id == current_user['id'])
+        .where(Purchase.user_id == current_user['id'], Raffle.deleted_at.is_(None))
         .group_by(Raffle.id)
         .offset(skip)
         .limit(limit)
@@ -126,14 +135,14 @@ async def get_user_raffles(
             "id": raffle.id,
             "title": raffle.title,
             "description": raffle.description,
-            "ticket_price": float(raffle.ticket_price),
+            "ticket_price_cents": raffle.ticket_price_cents,
             "total_tickets": raffle.total_tickets,
             "tickets_sold": raffle.tickets_sold,
             "start_date": raffle.start_date,
             "end_date": raffle.end_date,
             "is_active": raffle.is_active,
             "tickets_bought": tickets,
-            "amount_spent": float(amount),
+            "amount_spent_cents": int(amount),
             "won": raffle.winner_id == current_user['id']
         }
         raffles_data.append(raffle_dict)
@@ -1,23 +1,30 @@
-from typing import List
+import asyncio
+from typing import Any, Dict, List, Union
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.dependencies.admission import require_admission
 from app.api.dependencies.auth import get_current_active_user
-from app.core.database import get_db
+from app.core.database import get_db, get_primary_read_db, get_read_db
 from app.models.schemas.purchase import (
     Purchase,
+    PurchaseBatchCreate,
     PurchaseCreate
 )
-from app.models.domain.purchase import Purchase as PurchaseModel
+from app.core.money import from_cents
+from app.models.domain.archive import ArchivedParticipation, ArchivedRaffle
+from app.models.domain.purchase import Purchase as PurchaseModel, PurchasePayment
 from app.models.domain.raffle import Raffle as RaffleModel
+from app.services.archive import purchase_archive
+from app.services.holds import load_checkout_raffles, sell_tickets
 from app.services.notifications import notification_service
 from app.services.notification_templates import NotificationTemplate
-from app.services.payments import payment_service
+from app.services.payments import items_metadata, payment_service
 
 router = APIRouter()
 
-@router.post("/", response_model=Purchase)
+@router.post("/", response_model=Purchase, dependencies=[Depends(require_admission)])
 async def create_purchase(
     *,
     db: AsyncSession = Depends(get_db),
@@ -28,13 +35,15 @@ async def create_purchase(
     Create a new purchase (buy raffle tickets).
     Validates:
     - Raffle exists and is active
-    - Enough tickets are available
+    - Enough tickets are available (the user's hold for the payment
+      intent, if it hasn't expired, guarantees them)
     - Total amount matches ticket price * quantity
-    - Payment is confirmed
+    - Payment is confirmed, and its intent paid that amount for this
+      raffle and quantity
     """
     # Get raffle to validate
     raffle = await db.get(RaffleModel, purchase_in.raffle_id)
-    if not raffle:
+    if not raffle or raffle.deleted_at:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Raffle not found"
@@ -47,36 +56,54 @@ async def create_purchase(
         )
     
     # Validate total amount
-    expected_amount = float(raffle.ticket_price) * purchase_in.quantity
-    if float(purchase_in.total_amount) != expected_amount:
+    if purchase_in.total_amount_cents != raffle.ticket_price_cents * purchase_in.quantity:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid total amount"
         )
     
-    # Verify payment
-    payment_confirmed = await payment_service.confirm_payment(
+    # Verify payment, and that it paid for this raffle and quantity
+    intent = await payment_service.confirm_payment(
         purchase_in.payment_intent_id
     )
-    if not payment_confirmed:
+    if not intent:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Payment not confirmed"
         )
-    
-    # Create purchase
-    purchase = PurchaseModel(
+    payment_service.check_payment(
+        intent,
+        purchase_in.total_amount_cents,
         user_id=current_user['id'],
         raffle_id=purchase_in.raffle_id,
-        quantity=purchase_in.quantity,
-        total_amount=purchase_in.total_amount,
-        payment_intent_id=purchase_in.payment_intent_id
+        quantity=purchase_in.quantity
     )
     
+    # Create purchase; RETURNING hands back the stored row in the same round-trip
     try:
-        db.add(purchase)
+        # Claim the payment intent first; a second claim violates the unique key
+        await db.execute(
+            insert(PurchasePayment)
+            .values(transaction_id=purchase_in.payment_intent_id)
+        )
+        await sell_tickets(
+            db,
+            user_id=current_user['id'],
+            quantities={purchase_in.raffle_id: purchase_in.quantity},
+            payment_intent_id=purchase_in.payment_intent_id
+        )
+        purchase = await db.scalar(
+            insert(PurchaseModel)
+            .values(
+                user_id=current_user['id'],
+                raffle_id=purchase_in.raffle_id,
+                quantity=purchase_in.quantity,
+                total_amount_cents=purchase_in.total_amount_cents,
+                transaction_id=purchase_in.payment_intent_id
+            )
+            .returning(PurchaseModel)
+        )
         await db.commit()
-        await db.refresh(purchase)
         
         # Send purchase confirmation notification
         await notification_service.trigger_event(
@@ -86,11 +113,14 @@ async def create_purchase(
                 "full_name": current_user.get('full_name', ''),
                 "raffle_title": raffle.title,
                 "quantity": purchase_in.quantity,
-                "total_amount": float(purchase_in.total_amount)
+                "total_amount": str(from_cents(purchase_in.total_amount_cents))
             }
         )
         
         return purchase
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as e:
         await db.rollback()
         raise HTTPException(
@@ -98,30 +128,155 @@ async def create_purchase(
             detail=str(e)
         )
 
+@router.post("/batch", response_model=List[Purchase], dependencies=[Depends(require_admission)])
+async def create_batch_purchase(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user),
+    purchase_in: PurchaseBatchCreate
+) -> List[PurchaseModel]:
+    """
+    Buy tickets of several raffles with one payment intent (see
+    /payments/create-batch-intent), all or none.
+    Validates the same as a single purchase, with total_amount_cents covering
+    every item and the payment intent made for exactly these items, in a
+    fixed number of queries however many items there are.
+    """
+    quantities = {item.raffle_id: item.quantity for item in purchase_in.items}
+    raffles = await load_checkout_raffles(db, quantities)
+    
+    # Validate total amount
+    amounts = {
+        raffle_id: raffles[raffle_id].ticket_price_cents * quantity
+        for raffle_id, quantity in quantities.items()
+    }
+    if purchase_in.total_amount_cents != sum(amounts.values()):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid total amount"
+        )
+    
+    # Verify payment, and that it paid for these items
+    intent = await payment_service.confirm_payment(
+        purchase_in.payment_intent_id
+    )
+    if not intent:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Payment not confirmed"
+        )
+    payment_service.check_payment(
+        intent,
+        purchase_in.total_amount_cents,
+        user_id=current_user['id'],
+        items=items_metadata(quantities)
+    )
+    
+    try:
+        await db.execute(
+            insert(PurchasePayment)
+            .values(transaction_id=purchase_in.payment_intent_id)
+        )
+        await sell_tickets(
+            db,
+            user_id=current_user['id'],
+            quantities=quantities,
+            payment_intent_id=purchase_in.payment_intent_id
+        )
+        # One multi-row INSERT everywhere; asking RETURNING for parameter
+        # order makes SQLite insert row by row, so order the rows here instead
+        result = await db.scalars(
+            insert(PurchaseModel).returning(PurchaseModel),
+            [
+                {
+                    "user_id": current_user['id'],
+                    "raffle_id": raffle_id,
+                    "quantity": quantity,
+                    "total_amount_cents": amounts[raffle_id],
+                    "transaction_id": purchase_in.payment_intent_id,
+                }
+                for raffle_id, quantity in quantities.items()
+            ]
+        )
+        by_raffle = {purchase.raffle_id: purchase for purchase in result}
+        purchases = [by_raffle[raffle_id] for raffle_id in quantities]
+        await db.commit()
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    await asyncio.gather(*(
+        notification_service.trigger_event(
+            name=NotificationTemplate.TICKET_PURCHASE,
+            subscriber_id=current_user['id'],
+            payload={
+                "full_name": current_user.get('full_name', ''),
+                "raffle_title": raffles[purchase.raffle_id].title,
+                "quantity": purchase.quantity,
+                "total_amount": str(from_cents(purchase.total_amount_cents))
+            }
+        )
+        for purchase in purchases
+    ))
+    return purchases
+
 @router.get("/", response_model=List[Purchase])
 async def list_user_purchases(
     *,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_active_user),
     skip: int = 0,
-    limit: int = 100
-) -> List[PurchaseModel]:
+    limit: int = 100,
+    include_archived: bool = False
+) -> List[Union[PurchaseModel, Dict[str, Any]]]:
     """
     List all purchases for the current user.
+    With include_archived, purchases of archived raffles follow the
+    current ones, most recently ended raffle first.
     """
     query = (
         select(PurchaseModel)
         .where(PurchaseModel.user_id == current_user['id'])
+        # Newest first: Postgres reads the latest partitions and stops at limit
+        .order_by(PurchaseModel.purchase_date.desc(), PurchaseModel.id.desc())
         .offset(skip)
         .limit(limit)
     )
     result = await db.execute(query)
-    return result.scalars().all()
+    purchases = result.scalars().all()
+    if not include_archived or len(purchases) == limit:
+        return purchases
+
+    # The page ran past the current purchases; continue into the archive
+    archived_skip = 0
+    if not purchases and skip:
+        current_count = await db.scalar(
+            select(func.count())
+            .select_from(PurchaseModel)
+            .where(PurchaseModel.user_id == current_user['id'])
+        )
+        archived_skip = skip - current_count
+    raffle_ids = await db.scalars(
+        select(ArchivedParticipation.raffle_id)
+        .join(ArchivedRaffle, ArchivedRaffle.id == ArchivedParticipation.raffle_id)
+        .where(ArchivedParticipation.user_id == current_user['id'])
+        .order_by(ArchivedRaffle.end_date.desc())
+    )
+    archived = await purchase_archive.read_user_purchases(
+        current_user['id'], raffle_ids.all(), archived_skip + limit - len(purchases)
+    )
+    return [*purchases, *archived[archived_skip:]]
 
 @router.get("/{purchase_id}", response_model=Purchase)
 async def get_purchase(
     *,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_primary_read_db),
     current_user: dict = Depends(get_current_active_user),
     purchase_id: int
 ) -> PurchaseModel:
@@ -140,7 +295,7 @@ async def get_purchase(
 @router.get("/raffle/{raffle_id}", response_model=List[Purchase])
 async def list_raffle_purchases(
     *,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_primary_read_db),
     current_user: dict = Depends(get_current_active_user),
     raffle_id: int,
     skip: int = 0,
@@ -153,7 +308,7 @@ async def list_raffle_purchases(
     query = (
         select(PurchaseModel)
         .where(
-            PurchaseModel.raffle_id == raffle_id,
+            PurchaseModel.in_raffle(raffle_id),
             PurchaseModel.user_id == current_user['id']
         )
         .offset(skip)
@@ -1,19 +1,30 @@
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from datetime import datetime, timedelta
-import random
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy import select, func
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, WebSocket, WebSocketException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies.auth import get_current_active_user
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.models.schemas.draw import RaffleDraw
 from app.models.schemas.raffle import (
     Raffle,
     RaffleCreate,
+    RaffleSearchResult,
+    RaffleSearchResults,
     RaffleUpdate
 )
+from app.models.domain.draw import RaffleDraw as RaffleDrawModel
 from app.models.domain.raffle import Raffle as RaffleModel
 from app.models.domain.purchase import Purchase as PurchaseModel
+from app.services.draws import commit_seed, draw_winner
+from app.services.feeds import Feed, raffle_feeds
+from app.services.inventory import inventory_hub, inventory_state
+from app.services.search import search_raffles
 from app.services.notifications import notification_service
 from app.services.notification_templates import NotificationTemplate
 
@@ -28,7 +39,7 @@ async def check_ending_soon(
         # Get all participants
         query = (
             select(PurchaseModel.user_id)
-            .where(PurchaseModel.raffle_id == raffle.id)
+            .where(PurchaseModel.in_raffle(raffle.id))
             .distinct()
         )
         result = await db.execute(query)
@@ -45,28 +56,6 @@ async def check_ending_soon(
                 }
             )
 
-async def select_winner(
-    db: AsyncSession,
-    raffle_id: int
-) -> Optional[str]:
-    """Select a random winner from raffle participants"""
-    # Get all tickets as individual entries
-    query = (
-        select(PurchaseModel.user_id)
-        .where(
-            PurchaseModel.raffle_id == raffle_id,
-        )
-    )
-    result = await db.execute(query)
-    tickets = result.scalars().all()
-    
-    if not tickets:
-        return None
-    
-    # Select random winner
-    winner_id = random.choice(tickets)
-    return winner_id
-
 @router.post("/", response_model=Raffle)
 async def create_raffle(
     *,
@@ -76,7 +65,8 @@ async def create_raffle(
     background_tasks: BackgroundTasks
 ) -> RaffleModel:
     """
-    Create new raffle.
+    Create new raffle, committing to the seed its winner will be drawn
+    with (see GET /raffles/{raffle_id}/draw).
     Only superusers can create raffles.
     """
     if not current_user.get('is_superuser'):
@@ -85,10 +75,14 @@ async def create_raffle(
             detail="Not enough permissions"
         )
     
-    raffle = RaffleModel(**raffle_in.model_dump())
-    db.add(raffle)
+    raffle = await db.scalar(
+        insert(RaffleModel)
+        .values(**raffle_in.model_dump())
+        .returning(RaffleModel)
+    )
+    db.add(commit_seed(raffle.id))
     await db.commit()
-    await db.refresh(raffle)
+    raffle_feeds.record_raffle(raffle)
     # Check if raffle is ending soon
     background_tasks.add_task(check_ending_soon, db, raffle)
     return raffle
@@ -96,7 +90,7 @@ async def create_raffle(
 @router.get("/", response_model=List[Raffle])
 async def list_raffles(
     *,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
     active_only: bool = False
@@ -105,30 +99,155 @@ async def list_raffles(
     List all raffles.
     Optionally filter by active status.
     """
-    query = select(RaffleModel)
+    query = select(RaffleModel).where(RaffleModel.deleted_at.is_(None))
     if active_only:
         query = query.where(RaffleModel.is_active == True)
-    query = query.offset(skip).limit(limit)
+    query = query.order_by(RaffleModel.id).offset(skip).limit(limit)
     result = await db.execute(query)
     return result.scalars().all()
 
+@router.get("/search", response_model=RaffleSearchResults)
+async def search_open_raffles(
+    *,
+    db: AsyncSession = Depends(get_read_db),
+    q: Optional[str] = None,
+    min_price_cents: Optional[int] = None,
+    max_price_cents: Optional[int] = None,
+    ending_within_hours: Optional[float] = None,
+    cursor: Optional[str] = None,
+    limit: int = 20
+) -> Dict[str, Any]:
+    """
+    Search open raffles by title and description, optionally within a
+    ticket price range or ending within the given hours.
+    Results are ranked by relevance to q, or ending soonest first without
+    one. Pass next_cursor back as cursor for the next page.
+    """
+    results, next_cursor = await search_raffles(
+        db, q, min_price_cents, max_price_cents, ending_within_hours, cursor, limit
+    )
+    raffles = []
+    for raffle, rank in results:
+        result = RaffleSearchResult.model_validate(raffle)
+        result.rank = rank
+        raffles.append(result)
+    return {"raffles": raffles, "next_cursor": next_cursor}
+
+@router.get("/feeds/{feed}", response_model=List[Raffle])
+async def get_raffle_feed(
+    *,
+    db: AsyncSession = Depends(get_read_db),
+    feed: Feed,
+    skip: int = 0,
+    limit: int = 20
+) -> List[RaffleModel]:
+    """
+    Open raffles ending soonest (ending-soon), with the most tickets sold
+    (popular) or with the smallest share of tickets left (nearly-sold-out).
+    Feeds are read from Redis and trail purchases by up to
+    FEED_FLUSH_INTERVAL seconds.
+    """
+    limit = max(1, min(limit, settings.FEED_MAX_LIMIT))
+    return await raffle_feeds.load(db, feed, max(skip, 0), limit)
+
 @router.get("/{raffle_id}", response_model=Raffle)
 async def get_raffle(
     *,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     raffle_id: int
 ) -> RaffleModel:
     """
     Get raffle by ID.
     """
     raffle = await db.get(RaffleModel, raffle_id)
-    if not raffle:
+    if not raffle or raffle.deleted_at:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Raffle not found"
         )
     return raffle
 
+async def current_inventory(db: AsyncSession, raffle_id: int) -> Optional[Dict[str, Any]]:
+    """
+    A raffle's inventory state, from the hub when this worker already
+    follows the raffle. Releases db's connection, which a long-lived
+    stream must not hold.
+    """
+    state = inventory_hub.latest(raffle_id)
+    if state is None:
+        raffle = await db.get(RaffleModel, raffle_id)
+        if raffle and not raffle.deleted_at:
+            state = inventory_state(
+                raffle.id,
+                raffle.tickets_sold,
+                raffle.tickets_held,
+                raffle.total_tickets,
+                raffle.is_active,
+                raffle.winner_id
+            )
+    await db.close()
+    return state
+
+async def inventory_events(raffle_id: int, state: Dict[str, Any]) -> AsyncIterator[str]:
+    """Server-Sent Events of a raffle's inventory, with keep-alive comments."""
+    async with inventory_hub.subscribe(raffle_id, state) as subscription:
+        while True:
+            state = await subscription.next(settings.INVENTORY_HEARTBEAT_INTERVAL)
+            if state is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: inventory\ndata: {json.dumps(state)}\n\n"
+
+@router.get("/{raffle_id}/inventory/stream")
+async def stream_raffle_inventory(
+    *,
+    db: AsyncSession = Depends(get_read_db),
+    raffle_id: int
+) -> StreamingResponse:
+    """
+    Stream a raffle's tickets sold, tickets remaining and status as
+    Server-Sent Events: the current state, then every change, at most
+    INVENTORY_MAX_UPDATES_PER_SECOND times a second.
+    """
+    state = await current_inventory(db, raffle_id)
+    if not state:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Raffle not found"
+        )
+    return StreamingResponse(
+        inventory_events(raffle_id, state),
+        media_type="text/event-stream",
+        # Proxies must pass events through as they are sent
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/{raffle_id}/inventory/ws")
+async def raffle_inventory_websocket(
+    websocket: WebSocket,
+    raffle_id: int,
+    db: AsyncSession = Depends(get_read_db)
+) -> None:
+    """WebSocket variant of the inventory stream; sends one JSON message per state."""
+    state = await current_inventory(db, raffle_id)
+    if not state:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Raffle not found")
+    await websocket.accept()
+
+    async def until_disconnect() -> None:
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    disconnected = asyncio.create_task(until_disconnect())
+    try:
+        async with inventory_hub.subscribe(raffle_id, state) as subscription:
+            while not disconnected.done():
+                state = await subscription.next(settings.INVENTORY_HEARTBEAT_INTERVAL)
+                if state is not None and not disconnected.done():
+                    await websocket.send_json(state)
+    finally:
+        disconnected.cancel()
+
 @router.put("/{raffle_id}", response_model=Raffle)
 async def update_raffle(
     *,
@@ -147,19 +266,24 @@ async def update_raffle(
             detail="Not enough permissions"
         )
     
-    raffle = await db.get(RaffleModel, raffle_id)
-    if not raffle:
+    update_data = raffle_in.model_dump(exclude_unset=True)
+    if update_data:
+        raffle = await db.scalar(
+            update(RaffleModel)
+            .where(RaffleModel.id == raffle_id, RaffleModel.deleted_at.is_(None))
+            .values(**update_data)
+            .returning(RaffleModel)
+        )
+    else:
+        raffle = await db.get(RaffleModel, raffle_id)
+    if not raffle or raffle.deleted_at:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Raffle not found"
         )
     
-    update_data = raffle_in.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(raffle, field, value)
-    
     await db.commit()
-    await db.refresh(raffle)
+    raffle_feeds.record_raffle(raffle)
     return raffle
 
 @router.post("/{raffle_id}/select-winner", response_model=Raffle)
@@ -170,7 +294,11 @@ async def select_raffle_winner(
     raffle_id: int
 ) -> RaffleModel:
     """
-    Select a winner for the raffle.
+    Draw the raffle's winner from its committed seed; every ticket has an
+    equal chance. The draw is recorded, seed revealed, at
+    GET /raffles/{raffle_id}/draw.
+    Ended raffles are drawn in the background anyway; this draws one
+    without waiting for the next DRAW_INTERVAL.
     Only superusers can select winners.
     """
     if not current_user.get('is_superuser'):
@@ -179,8 +307,9 @@ async def select_raffle_winner(
             detail="Not enough permissions"
         )
     
-    raffle = await db.get(RaffleModel, raffle_id)
-    if not raffle:
+    # Locked until the draw commits, so no purchase can slip in meanwhile
+    raffle = await db.get(RaffleModel, raffle_id, with_for_update=True)
+    if not raffle or raffle.deleted_at:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Raffle not found"
@@ -198,18 +327,23 @@ async def select_raffle_winner(
             detail="Raffle has not ended yet"
         )
     
-    winner_id = await select_winner(db, raffle_id)
-    if not winner_id:
+    draw = await draw_winner(db, raffle_id)
+    if not draw:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No participants in raffle"
         )
+    winner_id = draw.winner_id
     
     # Update raffle with winner
-    raffle.winner_id = winner_id
-    raffle.is_active = False
+    raffle = await db.scalar(
+        update(RaffleModel)
+        .where(RaffleModel.id == raffle_id)
+        .values(winner_id=winner_id, is_active=False)
+        .returning(RaffleModel)
+        .execution_options(populate_existing=True)
+    )
     await db.commit()
-    await db.refresh(raffle)
     
     # Notify winner
     await notification_service.trigger_event(
@@ -222,15 +356,39 @@ async def select_raffle_winner(
     
     return raffle
 
-router.delete("/{raffle_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.get("/{raffle_id}/draw", response_model=RaffleDraw)
+async def get_raffle_draw(
+    *,
+    db: AsyncSession = Depends(get_read_db),
+    raffle_id: int
+) -> RaffleDraw:
+    """
+    The raffle's seed commitment and, once the winner is drawn, the
+    revealed seed and everything needed to repeat the draw.
+    """
+    draw = await db.scalar(select(RaffleDrawModel).where(RaffleDrawModel.raffle_id == raffle_id))
+    if not draw:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Draw not found"
+        )
+    result = RaffleDraw.model_validate(draw)
+    if draw.revealed_at is None:
+        result.seed = None
+    return result
+
+@router.delete("/{raffle_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_raffle(
     *,
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_active_user),
     raffle_id: int
-):
+) -> None:
     """
     Delete raffle.
+    The raffle is hidden and closed at once; its purchases and the raffle
+    row are removed in the background, PURGE_BATCH_SIZE rows at a time,
+    so deleting a raffle with many purchases never locks the purchase table.
     Only superusers can delete raffles.
     """
     if not current_user.get('is_superuser'):
@@ -239,12 +397,16 @@ async def delete_raffle(
             detail="Not enough permissions"
         )
     
-    raffle = await db.get(RaffleModel, raffle_id)
-    if not raffle:
+    deleted = await db.scalar(
+        update(RaffleModel)
+        .where(RaffleModel.id == raffle_id, RaffleModel.deleted_at.is_(None))
+        .values(deleted_at=datetime.utcnow(), is_active=False)
+        .returning(RaffleModel.id)
+        .execution_options(synchronize_session=False)
+    )
+    if deleted is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Raffle not found"
         )
-    
-    await db.delete(raffle)
     await db.commit()
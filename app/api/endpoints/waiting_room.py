@@ -0,0 +1,51 @@
+from typing import Any, Dict
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.dependencies.auth import get_current_active_user
+from app.core.database import get_db
+from app.models.schemas.waiting_room import QueueStatus, QueueTicket
+from app.services.admission import admission_control
+
+router = APIRouter()
+
+@router.post("/{raffle_id}/join", response_model=QueueTicket)
+async def join_waiting_room(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user),
+    raffle_id: int
+) -> Dict[str, Any]:
+    """
+    Take a place in a raffle's checkout queue.
+    The returned token goes in the X-Admission-Token header of
+    create-intent and purchase requests once admitted. Joining again
+    returns the same place until it expires, and only then goes to the
+    back of the queue.
+    """
+    ticket = await admission_control.join(db, raffle_id, current_user['id'])
+    if ticket is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Raffle has no waiting room"
+        )
+    return ticket
+
+@router.get("/{raffle_id}/status", response_model=QueueStatus)
+async def get_waiting_room_status(
+    *,
+    current_user: dict = Depends(get_current_active_user),
+    raffle_id: int,
+    x_admission_token: str = Header()
+) -> Dict[str, Any]:
+    """
+    Queue position and expected wait of an admission token.
+    Computed from the token; polling it costs no database access.
+    """
+    claims = admission_control.read_token(x_admission_token)
+    if not claims or claims["raffle_id"] != raffle_id or claims["sub"] != str(current_user['id']):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid or expired admission token"
+        )
+    return admission_control.status(claims)
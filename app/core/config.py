@@ -1,5 +1,6 @@
-from typing import List
-from pydantic_settings import BaseSettings
+import json
+from typing import Annotated, List
+from pydantic_settings import BaseSettings, NoDecode
 from pydantic import AnyHttpUrl, validator
 
 class Settings(BaseSettings):
@@ -28,6 +29,7 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
     DATABASE_URI: str | None = None
+    LOCAL_DATABASE: bool = False  # Connect to DATABASE_URI instead of the Supabase database
 
     @validator("DATABASE_URI", pre=True)
     def assemble_db_connection(cls, v: str | None, values: dict[str, any]) -> any:
@@ -35,6 +37,87 @@ class Settings(BaseSettings):
             return v
         return f"postgresql+asyncpg://{values.get('POSTGRES_USER')}:{values.get('POSTGRES_PASSWORD')}@{values.get('POSTGRES_SERVER')}/{values.get('POSTGRES_DB')}"
 
+    # Connection pool, sized per worker process
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+
+    # Statement caching
+    DB_QUERY_CACHE_SIZE: int = 1200  # SQLAlchemy compiled-query cache per engine
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 500  # Prepared statements per connection
+    DB_PGBOUNCER_MODE: bool = False  # Transaction pooling: no named statement reuse
+
+    # Read replicas used by GET endpoints; empty means read from the primary
+    # NoDecode: the comma-separated form would otherwise be parsed as JSON first
+    DATABASE_REPLICA_URIS: Annotated[List[str], NoDecode] = []
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_INTERVAL: float = 2.0
+
+    # Monthly purchase partitions, created this many months ahead
+    PURCHASE_PARTITIONS_AHEAD: int = 3
+    PARTITION_MAINTENANCE_INTERVAL: float = 6 * 3600.0
+
+    # Archival of closed raffles to local files
+    ARCHIVE_DIR: str = "archive"
+    ARCHIVE_AFTER_DAYS: int = 90  # Days after end_date before a closed raffle is archived
+    ARCHIVE_FORMAT: str = "csv"  # csv (gzip) or parquet (requires pyarrow)
+    ARCHIVE_BATCH_SIZE: int = 5000  # Rows per streamed chunk and per delete
+    ARCHIVE_BUCKETS: int = 64  # Files per raffle, split by user id
+
+    # Analytics rollups, refreshed by each worker in turn
+    ROLLUP_REFRESH_INTERVAL: float = 60.0
+
+    # Raffle inventory push (SSE and WebSocket)
+    INVENTORY_MAX_UPDATES_PER_SECOND: float = 2.0  # Per raffle, per client
+    INVENTORY_HEARTBEAT_INTERVAL: float = 15.0  # Keeps idle streams open through proxies
+    INVENTORY_RECONNECT_DELAY: float = 1.0
+
+    # Checkout waiting rooms
+    ADMISSION_WINDOW_SECONDS: int = 600  # Time to check out once admitted
+    ADMISSION_REFRESH_INTERVAL: float = 5.0  # Reload of which raffles have a waiting room
+
+    # Ticket holds between create-intent and purchase
+    HOLD_TTL_SECONDS: int = 600  # Time to pay before held tickets are released
+    HOLD_SWEEP_INTERVAL: float = 30.0
+    HOLD_SWEEP_BATCH_SIZE: int = 1000  # Holds released per transaction
+    CHECKOUT_MAX_ITEMS: int = 20  # Raffles in one batch checkout
+
+    # Winner draws
+    DRAW_BATCH_SIZE: int = 10000  # Purchases read per query
+    DRAW_INTERVAL: float = 60.0  # Ended raffles are drawn this often
+    DRAW_BATCH_RAFFLES: int = 50  # Raffles drawn per transaction
+    DRAW_CONCURRENCY: int = 4  # Ticket scans at once, each on its own connection
+
+    # Raffle search
+    SEARCH_MAX_LIMIT: int = 100  # Results per page
+
+    # Storefront feeds, kept in Redis sorted sets
+    FEED_FLUSH_INTERVAL: float = 1.0  # Changes heard are written to Redis this often
+    FEED_REBUILD_INTERVAL: float = 300.0  # Feeds are rewritten from the database this often
+    FEED_MAX_LIMIT: int = 100  # Raffles per page
+
+    # Background purge of deleted raffles
+    PURGE_INTERVAL: float = 60.0
+    PURGE_BATCH_SIZE: int = 5000  # Purchases deleted per transaction
+
+    # Admin exports, streamed from a server-side cursor
+    EXPORT_BATCH_SIZE: int = 2000  # Rows fetched and encoded per chunk
+    EXPORT_GZIP_LEVEL: int = 6
+
+    @validator("DATABASE_REPLICA_URIS", pre=True)
+    def assemble_replica_uris(cls, v: str | List[str]) -> List[str]:
+        if isinstance(v, str) and not v.startswith("["):
+            return [i.strip() for i in v.split(",") if i.strip()]
+        if isinstance(v, str):
+            return json.loads(v)
+        return v
+
+    # Server Configuration
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    WORKERS: int | None = None  # Defaults to the number of CPUs
+    GRACEFUL_SHUTDOWN_TIMEOUT: int = 30
+    KEEPALIVE_TIMEOUT: int = 5
+
     # Redis Configuration
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
@@ -47,12 +130,28 @@ class Settings(BaseSettings):
     STRIPE_API_KEY: str = "your-stripe-api-key"  # Replace with actual key from env
     STRIPE_WEBHOOK_SECRET: str = "your-stripe-webhook-secret"  # Replace with actual secret from env
     STRIPE_CURRENCY: str = "usd"
+    STRIPE_API_BASE: str = "https://api.stripe.com"
     
     # Novu Configuration
     NOVU_API_KEY: str = "your-novu-api-key"  # Replace with actual key from env
     NOVU_API_URL: str = "https://api.novu.co"
     NOVU_APP_IDENTIFIER: str = "your-novu-app-id"  # Replace with actual app ID from env
     
+    # Resilience for remote calls (Supabase, Stripe, Novu, Redis)
+    SUPABASE_TIMEOUT: float = 5.0
+    SUPABASE_MAX_CONCURRENCY: int = 20
+    SUPABASE_HEDGE_AFTER: float | None = None  # Seconds before hedging idempotent reads
+    STRIPE_TIMEOUT: float = 10.0
+    STRIPE_MAX_CONCURRENCY: int = 20
+    NOVU_TIMEOUT: float = 3.0
+    NOVU_MAX_CONCURRENCY: int = 10
+    REDIS_TIMEOUT: float = 0.5
+    REDIS_MAX_CONCURRENCY: int = 50
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RESET_TIMEOUT: float = 30.0
+    RETRY_ATTEMPTS: int = 2  # Extra attempts for idempotent calls
+    RETRY_BACKOFF: float = 0.1
+    
     class Config:
         case_sensitive = True
         env_file = ".env"
@@ -0,0 +1,28 @@
+from collections import defaultdict
+from typing import Dict
+
+
+class Metrics:
+    """
+    In-process counters.
+    Each worker keeps its own registry; the /metrics endpoint reports the
+    counters of the worker that served the request.
+    """
+    def __init__(self) -> None:
+        self._counters: Dict[str, int] = defaultdict(int)
+
+    def increment(self, name: str, value: int = 1) -> None:
+        self._counters[name] += value
+
+    def get(self, name: str) -> int:
+        return self._counters.get(name, 0)
+
+    def ratio(self, numerator: str, denominator: str) -> float:
+        total = self.get(denominator)
+        return self.get(numerator) / total if total else 0.0
+
+    def snapshot(self) -> Dict[str, int]:
+        return dict(self._counters)
+
+
+metrics = Metrics()
@@ -0,0 +1,21 @@
+"""
+Money is integer cents everywhere: database columns, API fields (named
+*_cents), arithmetic and Stripe calls, which take cents too. Amounts are
+only turned into currency units for display.
+"""
+from decimal import Decimal
+from typing import Annotated, Union
+from pydantic import Field
+
+Cents = Annotated[int, Field(ge=0)]
+
+def to_cents(amount: Union[Decimal, str]) -> int:
+    """Cents of an amount in currency units; raises ValueError on fractions of a cent."""
+    cents = Decimal(amount).scaleb(2)
+    if cents != cents.to_integral_value():
+        raise ValueError(f"{amount} is not a whole number of cents")
+    return int(cents)
+
+def from_cents(cents: int) -> Decimal:
+    """Currency units of an amount in cents, for display."""
+    return Decimal(cents).scaleb(-2)
@@ -0,0 +1,84 @@
+import asyncio
+from datetime import date, datetime
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.core.config import settings
+from app.core.metrics import metrics
+
+PARTITIONED_TABLE = "purchase"
+DEFAULT_PARTITION = f"{PARTITIONED_TABLE}_default"
+
+# Serializes partition creation across workers (arbitrary, app-wide)
+PARTITION_LOCK_ID = 0x70617274
+
+def month_start(day: date, months: int = 0) -> date:
+    """First day of the month `months` after day's month."""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(month: date) -> str:
+    return f"{PARTITIONED_TABLE}_y{month.year}m{month.month:02d}"
+
+async def is_partitioned(conn: AsyncConnection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return await conn.scalar(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"
+    ), {"table": PARTITIONED_TABLE})
+
+async def ensure_purchase_partitions(
+    conn: AsyncConnection,
+    since: Optional[date] = None,
+    months_ahead: Optional[int] = None
+) -> List[str]:
+    """
+    Create the missing monthly purchase partitions from since's month
+    (default: this month) through months_ahead months from now, plus the
+    default partition. Returns the partitions created.
+    Runs inside the caller's transaction; a no-op unless purchase is partitioned.
+    """
+    if not await is_partitioned(conn):
+        return []
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": PARTITION_LOCK_ID})
+    existing = set((await conn.execute(text(
+        "SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = to_regclass(:table)"
+    ), {"table": PARTITIONED_TABLE})).scalars())
+
+    today = datetime.utcnow().date()
+    if months_ahead is None:
+        months_ahead = settings.PURCHASE_PARTITIONS_AHEAD
+    month = month_start(min(since or today, today))
+    last = month_start(today, months_ahead)
+
+    created = []
+    if DEFAULT_PARTITION not in existing:
+        await conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {PARTITIONED_TABLE} DEFAULT"))
+        created.append(DEFAULT_PARTITION)
+    while month <= last:
+        name = partition_name(month)
+        if name not in existing:
+            try:
+                # Fails if the default partition already holds rows for this month
+                async with conn.begin_nested():
+                    await conn.execute(text(
+                        f"CREATE TABLE {name} PARTITION OF {PARTITIONED_TABLE} "
+                        f"FOR VALUES FROM ('{month}') TO ('{month_start(month, 1)}')"
+                    ))
+                created.append(name)
+            except DBAPIError:
+                metrics.increment("partitions.failures")
+        month = month_start(month, 1)
+    metrics.increment("partitions.created", len(created))
+    return created
+
+async def maintain_partitions(engine) -> None:
+    """Keep partitions created ahead of time; run as a background task."""
+    while True:
+        try:
+            async with engine.begin() as conn:
+                await ensure_purchase_partitions(conn)
+        except Exception:
+            metrics.increment("partitions.failures")
+        await asyncio.sleep(settings.PARTITION_MAINTENANCE_INTERVAL)
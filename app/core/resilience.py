@@ -0,0 +1,209 @@
+import asyncio
+import functools
+import inspect
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple, Type
+
+from app.core.metrics import metrics
+
+
+class DependencyUnavailableError(Exception):
+    """A remote dependency timed out, is tripped open or is at capacity."""
+    def __init__(self, name: str, reason: str, retry_after: float = 0) -> None:
+        super().__init__(f"{name} unavailable: {reason}")
+        self.name = name
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+    Opens after failure_threshold failures in a row; after reset_timeout
+    seconds a single half-open probe is let through, which closes the
+    circuit on success and re-opens it on failure.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def retry_after(self) -> float:
+        """Seconds until the next probe; 0 unless the circuit is open."""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN and self.retry_after() == 0:
+            self.state = self.HALF_OPEN
+            self._probing = False
+        if self.state == self.HALF_OPEN:
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+        return self.state == self.CLOSED
+
+    def abandon_probe(self) -> None:
+        """Let another call probe when this one never reached the dependency."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                metrics.increment(f"resilience.{self.name}.trips")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._probing = False
+
+
+class Dependency:
+    """
+    Guards calls to one remote dependency with a timeout, a circuit
+    breaker, a bulkhead of max_concurrency in-flight calls and, for
+    idempotent calls, jittered retries and an optional hedged second
+    attempt after hedge_after seconds.
+
+    Synchronous SDK calls run on the dependency's own max_concurrency
+    threads so they don't block the event loop; a thread that outlives its
+    timeout keeps its bulkhead slot until it returns.
+
+    Only exceptions in failure_exceptions (plus timeouts) count against
+    the breaker, once per call however many attempts it took, and surface
+    as DependencyUnavailableError; others, such as a declined card, pass
+    through untouched.
+    """
+    def __init__(
+        self,
+        name: str,
+        *,
+        timeout: float,
+        max_concurrency: int,
+        failure_threshold: int,
+        reset_timeout: float,
+        retries: int = 0,
+        backoff: float = 0.1,
+        hedge_after: Optional[float] = None,
+        queue_timeout: float = 0.5,
+        failure_exceptions: Tuple[Type[BaseException], ...] = (),
+    ) -> None:
+        self.name = name
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.hedge_after = hedge_after
+        self.queue_timeout = queue_timeout
+        self.failure_exceptions = failure_exceptions
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+        self._bulkhead = asyncio.Semaphore(max_concurrency)
+        # Its own threads, so calls hung on this dependency can't starve others
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=name)
+
+    def _count(self, event: str) -> None:
+        metrics.increment(f"resilience.{self.name}.{event}")
+
+    async def _acquire(self) -> None:
+        try:
+            await asyncio.wait_for(self._bulkhead.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._count("rejected")
+            raise DependencyUnavailableError(self.name, "too many concurrent calls")
+
+    async def _attempt(self, func: Callable[..., Any], args, kwargs) -> Any:
+        await self._acquire()
+        if inspect.iscoroutinefunction(func):
+            future = asyncio.ensure_future(func(*args, **kwargs))
+            future.add_done_callback(lambda _: self._bulkhead.release())
+        else:
+            loop = asyncio.get_running_loop()
+            thread_future = self._executor.submit(functools.partial(func, *args, **kwargs))
+            # Released when the thread returns, not when the caller gives up on it
+            thread_future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._bulkhead.release))
+            future = asyncio.wrap_future(thread_future)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self._count("timeouts")
+            if isinstance(future, asyncio.Task):
+                future.cancel()
+            else:
+                # A running thread can't be stopped; just drop its late result
+                future.add_done_callback(lambda done: done.cancelled() or done.exception())
+            raise
+
+    async def _hedged_attempt(self, func: Callable[..., Any], args, kwargs) -> Any:
+        first = asyncio.ensure_future(self._attempt(func, args, kwargs))
+        done, _ = await asyncio.wait({first}, timeout=self.hedge_after)
+        if done:
+            return first.result()
+        self._count("hedges")
+        second = asyncio.ensure_future(self._attempt(func, args, kwargs))
+        pending = {first, second}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for attempt in done:
+                if attempt.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    return attempt.result()
+        return first.result()
+
+    async def call(self, func: Callable[..., Any], *args, idempotent: bool = False, **kwargs) -> Any:
+        """
+        Call func(*args, **kwargs) through the guard.
+        Pass idempotent=True only for calls that are safe to repeat. A call
+        whose every attempt times out or raises one of failure_exceptions
+        raises DependencyUnavailableError, and counts once against the
+        breaker.
+        """
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise DependencyUnavailableError(
+                self.name, "circuit open", retry_after=self.breaker.retry_after()
+            )
+        self._count("calls")
+        attempts = 1 + (self.retries if idempotent else 0)
+        for attempt in range(attempts):
+            try:
+                if idempotent and self.hedge_after is not None:
+                    result = await self._hedged_attempt(func, args, kwargs)
+                else:
+                    result = await self._attempt(func, args, kwargs)
+            except DependencyUnavailableError:
+                self.breaker.abandon_probe()
+                raise
+            except (asyncio.TimeoutError, *self.failure_exceptions) as exc:
+                if attempt + 1 < attempts:
+                    self._count("retries")
+                    # Full jitter exponential backoff
+                    await asyncio.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+                    continue
+                self._count("failures")
+                self.breaker.record_failure()
+                reason = "timed out" if isinstance(exc, asyncio.TimeoutError) else f"failed: {exc}"
+                raise DependencyUnavailableError(
+                    self.name, reason, retry_after=self.breaker.retry_after()
+                ) from exc
+            except Exception:
+                # The dependency answered; the error is the caller's to handle
+                self.breaker.record_success()
+                raise
+            self.breaker.record_success()
+            return result
@@ -1,5 +1,7 @@
-from supabase import create_client, Client
+import httpx
+from supabase import create_client, Client, AuthRetryableError
 from app.core.config import settings
+from app.core.resilience import Dependency
 
 def get_supabase_client() -> Client:
     """
@@ -11,3 +13,16 @@ def get_supabase_client() -> Client:
     )
 
 supabase = get_supabase_client()
+
+# Guard for every Supabase Auth/PostgREST call; see app.core.resilience
+supabase_dependency = Dependency(
+    "supabase",
+    timeout=settings.SUPABASE_TIMEOUT,
+    max_concurrency=settings.SUPABASE_MAX_CONCURRENCY,
+    failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=settings.CIRCUIT_RESET_TIMEOUT,
+    retries=settings.RETRY_ATTEMPTS,
+    backoff=settings.RETRY_BACKOFF,
+    hedge_after=settings.SUPABASE_HEDGE_AFTER,
+    failure_exceptions=(httpx.TransportError, AuthRetryableError),
+)
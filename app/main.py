@@ -1,13 +1,57 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from app.core.config import settings
+from app.core.database import AsyncSessionLocal, dispose_engines, engine, query_cache_stats
+from app.core.metrics import metrics
+from app.core.partitions import maintain_partitions
+from app.core.resilience import DependencyUnavailableError
+from app.services.admission import admission_control
+from app.services.deletion import sweep_deleted_raffles
+from app.services.draws import maintain_draws
+from app.services.feeds import raffle_feeds
+from app.services.holds import sweep_expired_holds
+from app.services.inventory import inventory_hub
+from app.services.rollups import maintain_rollups
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Per-worker resource lifecycle.
+    Each worker process imports the app on its own, so the engine and its
+    pool belong to that worker; release them once in-flight requests drain.
+    Purchase partitions are kept created ahead, analytics rollups refreshed,
+    raffle inventory changes fanned out, waiting rooms reloaded, expired
+    ticket holds released, ended raffles drawn, deleted raffles purged and
+    the storefront feeds kept in Redis while the worker runs.
+    """
+    partition_maintenance = asyncio.create_task(maintain_partitions(engine))
+    rollup_maintenance = asyncio.create_task(maintain_rollups(engine))
+    inventory_listener = asyncio.create_task(inventory_hub.run(engine))
+    admission_refresh = asyncio.create_task(admission_control.maintain(AsyncSessionLocal))
+    hold_sweeper = asyncio.create_task(sweep_expired_holds(AsyncSessionLocal))
+    winner_draws = asyncio.create_task(maintain_draws(AsyncSessionLocal))
+    deletion_sweeper = asyncio.create_task(sweep_deleted_raffles(AsyncSessionLocal))
+    feed_maintenance = asyncio.create_task(raffle_feeds.maintain(engine))
+    yield
+    partition_maintenance.cancel()
+    rollup_maintenance.cancel()
+    inventory_listener.cancel()
+    admission_refresh.cancel()
+    hold_sweeper.cancel()
+    winner_draws.cancel()
+    deletion_sweeper.cancel()
+    feed_maintenance.cancel()
+    await raffle_feeds.client.aclose()
+    await dispose_engines()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -31,11 +75,30 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         }
     )
 
+@app.exception_handler(DependencyUnavailableError)
+async def dependency_unavailable_handler(request: Request, exc: DependencyUnavailableError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"{exc.name} is temporarily unavailable"},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))}
+    )
+
 # Health check
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
 
+# Per-worker counters
+@app.get("/metrics")
+async def get_metrics():
+    return {
+        "counters": metrics.snapshot(),
+        "query_cache": query_cache_stats()
+    }
+
+# Register every ORM model so string relationship targets resolve
+from app.models.domain import analytics, archive, draw, ticket_hold, user, waiting_room  # noqa: F401
+
 # API router imports
 from app.api.api_v1.api import api_router
 app.include_router(api_router, prefix=settings.API_V1_STR)
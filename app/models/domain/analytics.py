@@ -0,0 +1,39 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from typing import Optional
+from app.models.domain.base import Base
+
+class RaffleHourlyStats(Base):
+    """
+    Purchases of one raffle in one hour, kept up to date by
+    app/services/rollups.py. Not tied to raffle by a foreign key, so the
+    history outlives archived raffles.
+    """
+    __tablename__ = "raffle_hourly_stats"
+    __table_args__ = (
+        Index("ix_raffle_hourly_stats_raffle_id_hour", "raffle_id", "hour", unique=True),
+        Index("ix_raffle_hourly_stats_hour", "hour"),
+    )
+
+    raffle_id: Mapped[int] = mapped_column(nullable=False)
+    hour: Mapped[datetime] = mapped_column(nullable=False)
+    purchases: Mapped[int] = mapped_column(nullable=False)
+    tickets: Mapped[int] = mapped_column(nullable=False)
+    revenue_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    buyers: Mapped[int] = mapped_column(nullable=False)
+
+class RaffleStats(Base):
+    """
+    Lifetime purchase totals of one raffle.
+    Unique buyers can't be summed from the hourly rows, so they are
+    counted here.
+    """
+    __tablename__ = "raffle_stats"
+
+    raffle_id: Mapped[int] = mapped_column(unique=True, nullable=False)
+    purchases: Mapped[int] = mapped_column(nullable=False)
+    tickets: Mapped[int] = mapped_column(nullable=False)
+    revenue_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    buyers: Mapped[int] = mapped_column(nullable=False)
+    last_purchase_at: Mapped[Optional[datetime]] = mapped_column()
@@ -0,0 +1,40 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, ForeignKey, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+from typing import Optional
+from app.models.domain.base import Base
+
+class ArchivedRaffle(Base):
+    """
+    A closed raffle moved out of the hot tables.
+    Keeps the raffle's original id; its purchases live in files under
+    location (see app/services/archive.py).
+    """
+    __tablename__ = "archived_raffle"
+
+    title: Mapped[str] = mapped_column(String, nullable=False)
+    ticket_price_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    total_tickets: Mapped[int] = mapped_column(nullable=False)
+    tickets_sold: Mapped[int] = mapped_column(nullable=False)
+    start_date: Mapped[datetime] = mapped_column(nullable=False)
+    end_date: Mapped[datetime] = mapped_column(nullable=False)
+    winner_id: Mapped[Optional[int]] = mapped_column(index=True)
+    purchase_count: Mapped[int] = mapped_column(nullable=False)
+    location: Mapped[str] = mapped_column(String, nullable=False)
+
+class ArchivedParticipation(Base):
+    """
+    Per user totals of an archived raffle's purchases.
+    Lets profile stats include archived history and tells the read-through
+    which archived raffles to open for a user.
+    """
+    __tablename__ = "archived_participation"
+    __table_args__ = (
+        Index("ix_archived_participation_user_id_raffle_id", "user_id", "raffle_id", unique=True),
+    )
+
+    user_id: Mapped[int] = mapped_column(nullable=False)
+    raffle_id: Mapped[int] = mapped_column(ForeignKey("archived_raffle.id"), nullable=False)
+    purchases: Mapped[int] = mapped_column(nullable=False)
+    tickets: Mapped[int] = mapped_column(nullable=False)
+    amount_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
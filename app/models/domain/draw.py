@@ -0,0 +1,29 @@
+from datetime import datetime
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+from typing import Optional
+from app.models.domain.base import Base
+
+class RaffleDraw(Base):
+    """
+    Commitment to, and audit record of, a raffle's winner draw (see
+    app/services/draws.py).
+    seed_hash is published from committed_at on; seed stays secret until
+    the draw reveals it along with everything needed to repeat the draw.
+    Not tied to raffle by a foreign key, so the record outlives archived
+    raffles.
+    """
+    __tablename__ = "raffle_draw"
+
+    raffle_id: Mapped[int] = mapped_column(unique=True, nullable=False)
+    seed: Mapped[str] = mapped_column(String(64), nullable=False)
+    seed_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    committed_at: Mapped[datetime] = mapped_column(nullable=False)
+    # Set by the draw
+    revealed_at: Mapped[Optional[datetime]] = mapped_column()
+    purchase_count: Mapped[Optional[int]] = mapped_column()
+    total_tickets: Mapped[Optional[int]] = mapped_column()
+    tickets_digest: Mapped[Optional[str]] = mapped_column(String(64))
+    winning_ticket: Mapped[Optional[int]] = mapped_column()
+    winning_purchase_id: Mapped[Optional[int]] = mapped_column()
+    winner_id: Mapped[Optional[int]] = mapped_column()
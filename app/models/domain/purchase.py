@@ -1,20 +1,91 @@
+import re
 from datetime import datetime
-from sqlalchemy import ForeignKey, Numeric, String
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import DDL, BigInteger, ForeignKey, Index, PrimaryKeyConstraint, String, and_, event, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Mapped, mapped_column, relationship, synonym
 from typing import Optional
 from app.models.domain.base import Base
+from app.models.domain.raffle import Raffle
 
 class Purchase(Base):
+    """
+    On Postgres, purchase is range partitioned by purchase_date month (see
+    app/core/partitions.py); queries that bound purchase_date only scan the
+    matching partitions.
+    """
     __tablename__ = "purchase"
-    
+    __table_args__ = (
+        Index(
+            "ix_purchase_user_id_raffle_id", "user_id", "raffle_id",
+            postgresql_include=["quantity", "total_amount_cents"]
+        ),
+        Index("ix_purchase_raffle_id_user_id", "raffle_id", "user_id"),
+        Index("ix_purchase_user_id_purchase_date", "user_id", "purchase_date"),
+        # Canonical ticket order of winner draws (app/services/draws.py)
+        Index(
+            "ix_purchase_raffle_id_purchase_date_id", "raffle_id", "purchase_date", "id",
+            postgresql_include=["user_id", "quantity"]
+        ),
+        {"postgresql_partition_by": "RANGE (purchase_date)"},
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     raffle_id: Mapped[int] = mapped_column(ForeignKey("raffle.id"), nullable=False)
     quantity: Mapped[int] = mapped_column(nullable=False)
-    total_amount: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False)
-    transaction_id: Mapped[str] = mapped_column(String, unique=True, index=True)
+    total_amount_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # Unique across partitions through PurchasePayment
+    transaction_id: Mapped[str] = mapped_column(String, index=True)
     purchase_date: Mapped[datetime] = mapped_column(default=datetime.utcnow, nullable=False)
-    
+
+    # Stripe payment intent the purchase was paid with
+    payment_intent_id = synonym("transaction_id")
+
     # Relationships
     user: Mapped["User"] = relationship("User", back_populates="purchases")
     raffle: Mapped["Raffle"] = relationship("Raffle", back_populates="purchases")
+
+    @classmethod
+    def in_raffle(cls, raffle_id: int):
+        """
+        Filter for a raffle's purchases.
+        No purchase predates its raffle's start_date, so bounding on it lets
+        Postgres skip the partitions from before the raffle opened.
+        """
+        start_date = select(Raffle.start_date).where(Raffle.id == raffle_id).scalar_subquery()
+        return and_(cls.raffle_id == raffle_id, cls.purchase_date >= start_date)
+
+class PurchasePayment(Base):
+    """
+    Payment intents already turned into a purchase.
+    A partitioned table can only enforce uniqueness within a partition, so
+    this small unpartitioned table stops a payment intent being spent twice.
+    """
+    __tablename__ = "purchase_payment"
+
+    transaction_id: Mapped[str] = mapped_column(String, unique=True, nullable=False)
+
+@compiles(PrimaryKeyConstraint, "postgresql")
+def _primary_key_with_partition_key(constraint, compiler, **kw):
+    """
+    Postgres requires a partitioned table's primary key to include the
+    partition columns; the ORM keeps identifying rows by id alone.
+    """
+    partition_by = constraint.table.dialect_options["postgresql"]["partition_by"]
+    if not partition_by:
+        return compiler.visit_primary_key_constraint(constraint, **kw)
+    partition_columns = re.search(r"\((.*)\)", partition_by).group(1).split(",")
+    columns = [column.name for column in constraint.columns]
+    columns += [name.strip() for name in partition_columns if name.strip() not in columns]
+    ddl = ""
+    if constraint.name is not None:
+        ddl += f"CONSTRAINT {compiler.preparer.format_constraint(constraint)} "
+    return ddl + f"PRIMARY KEY ({', '.join(compiler.preparer.quote(name) for name in columns)})"
+
+# create_all only builds the parent table; the default partition takes rows
+# until the monthly partitions are created at startup
+event.listen(
+    Purchase.__table__,
+    "after_create",
+    DDL("CREATE TABLE purchase_default PARTITION OF purchase DEFAULT").execute_if(dialect="postgresql"),
+)
@@ -1,22 +1,91 @@
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, DateTime, Numeric, ForeignKey, Boolean
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import DDL, BigInteger, Column, String, Integer, DateTime, ForeignKey, Boolean, Index, event, literal_column, text
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from sqlalchemy.orm import relationship
 import uuid
 
 from app.models.domain.base import Base
 
 class Raffle(Base):
+    __table_args__ = (
+        Index("ix_raffle_winner_id", "winner_id"),
+        # Ended raffles to draw, and storefront search in end_date order
+        Index("ix_raffle_active_end_date", "end_date", "id", postgresql_where=text("is_active")),
+        # Listing reads only live raffles; the purger only deleted ones
+        Index("ix_raffle_live_id", "id", postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_raffle_deleted_at", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
+    )
+
     title = Column(String, nullable=False)
     description = Column(String)
-    ticket_price = Column(Numeric(10, 2), nullable=False)
+    ticket_price_cents = Column(BigInteger, nullable=False)
     total_tickets = Column(Integer, nullable=False)
     tickets_sold = Column(Integer, default=0)
+    # Reserved by unexpired ticket holds; available = total - sold - held
+    tickets_held = Column(Integer, default=0, server_default="0", nullable=False)
     start_date = Column(DateTime, default=datetime.utcnow, nullable=False)
     end_date = Column(DateTime, nullable=False)
     is_active = Column(Boolean, default=True)
-    winner_id = Column(Integer, ForeignKey("user.id"), nullable=True)
+    winner_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    # Set by DELETE; the raffle is hidden at once and its rows are removed
+    # in the background by app/services/deletion.py
+    deleted_at = Column(DateTime, nullable=True)
     
     # Relationships
     winner = relationship("User", back_populates="won_raffles")
     purchases = relationship("Purchase", back_populates="raffle")
+
+# Changes to a raffle's inventory or status are announced on this channel
+# to every worker's listener (see app/services/inventory.py)
+INVENTORY_CHANNEL = "raffle_inventory"
+
+NOTIFY_INVENTORY_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION notify_raffle_inventory() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('{INVENTORY_CHANNEL}', json_build_object(
+        'raffle_id', NEW.id,
+        'tickets_sold', NEW.tickets_sold,
+        'tickets_held', NEW.tickets_held,
+        'total_tickets', NEW.total_tickets,
+        'is_active', NEW.is_active,
+        'winner_id', NEW.winner_id
+    )::text);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+NOTIFY_INVENTORY_TRIGGER = """
+CREATE TRIGGER raffle_inventory_notify
+AFTER UPDATE OF tickets_sold, tickets_held, total_tickets, is_active, winner_id ON raffle
+FOR EACH ROW
+WHEN (
+    (OLD.tickets_sold, OLD.tickets_held, OLD.total_tickets, OLD.is_active, OLD.winner_id)
+    IS DISTINCT FROM (NEW.tickets_sold, NEW.tickets_held, NEW.total_tickets, NEW.is_active, NEW.winner_id)
+)
+EXECUTE FUNCTION notify_raffle_inventory()
+"""
+
+for statement in (NOTIFY_INVENTORY_FUNCTION, NOTIFY_INVENTORY_TRIGGER):
+    event.listen(Raffle.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+# Storefront search (app/services/search.py). On Postgres, raffle carries a
+# generated tsvector of its title (weight A) and description (weight B);
+# it isn't mapped, so loading raffles never reads it.
+SEARCH_CONFIG = "english"
+SEARCH_VECTOR = literal_column("raffle.search_vector", TSVECTOR)
+
+ADD_SEARCH_VECTOR = f"""
+ALTER TABLE raffle ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')
+) STORED
+"""
+
+# Only open raffles are searched, so only they are indexed
+CREATE_SEARCH_INDEX = """
+CREATE INDEX ix_raffle_search_vector ON raffle USING gin (search_vector) WHERE is_active
+"""
+
+for statement in (ADD_SEARCH_VECTOR, CREATE_SEARCH_INDEX):
+    event.listen(Raffle.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
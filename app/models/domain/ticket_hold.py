@@ -0,0 +1,21 @@
+from datetime import datetime
+from sqlalchemy import ForeignKey, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.domain.base import Base
+
+class TicketHold(Base):
+    """
+    Tickets reserved for a payment intent until expires_at.
+    Counted in raffle.tickets_held while it exists; the purchase paid with
+    the intent turns it into sold tickets, and app/services/holds.py
+    releases it once expired.
+    """
+    __tablename__ = "ticket_hold"
+    # A batch checkout holds several raffles under one payment intent
+    __table_args__ = (UniqueConstraint("payment_intent_id", "raffle_id"),)
+
+    raffle_id: Mapped[int] = mapped_column(ForeignKey("raffle.id", ondelete="CASCADE"), nullable=False)
+    user_id: Mapped[int] = mapped_column(nullable=False)
+    quantity: Mapped[int] = mapped_column(nullable=False)
+    payment_intent_id: Mapped[str] = mapped_column(String, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(index=True, nullable=False)
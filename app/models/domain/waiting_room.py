@@ -0,0 +1,33 @@
+from sqlalchemy import Float, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.domain.base import Base
+
+class WaitingRoom(Base):
+    """
+    Admission queue of a raffle's checkout (see app/services/admission.py).
+    Users are let through at rate per second; next_admission is when the
+    next user to join will be admitted, as Unix seconds.
+    """
+    __tablename__ = "waiting_room"
+
+    raffle_id: Mapped[int] = mapped_column(
+        ForeignKey("raffle.id", ondelete="CASCADE"), unique=True, nullable=False
+    )
+    rate: Mapped[float] = mapped_column(Float, nullable=False)
+    next_admission: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+
+class WaitingRoomSlot(Base):
+    """
+    A user's place in a waiting room: admitted from admit_at until
+    expires_at, both Unix seconds. Joining again while it is valid hands
+    back the same place, so a user holds at most one per raffle.
+    """
+    __tablename__ = "waiting_room_slot"
+    __table_args__ = (UniqueConstraint("raffle_id", "user_id"),)
+
+    raffle_id: Mapped[int] = mapped_column(
+        ForeignKey("waiting_room.raffle_id", ondelete="CASCADE"), nullable=False
+    )
+    user_id: Mapped[int] = mapped_column(nullable=False)
+    admit_at: Mapped[float] = mapped_column(Float, nullable=False)
+    expires_at: Mapped[float] = mapped_column(Float, index=True, nullable=False)
@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+from app.core.money import Cents
+
+class AnalyticsTotals(BaseModel):
+    purchases: int
+    tickets: int
+    revenue_cents: Cents
+
+class HourlyAnalytics(AnalyticsTotals):
+    hour: datetime
+    buyers: Optional[int] = None  # Only for a single raffle
+
+class RaffleAnalytics(AnalyticsTotals):
+    raffle_id: int
+    title: Optional[str] = None
+    lifetime_buyers: Optional[int] = None
+    tickets_sold: Optional[int] = None
+    total_tickets: Optional[int] = None
+    sell_through: Optional[float] = None  # tickets_sold / total_tickets
+
+class Analytics(BaseModel):
+    start: datetime
+    end: datetime
+    totals: AnalyticsTotals
+    hourly: List[HourlyAnalytics]
+    raffles: List[RaffleAnalytics]
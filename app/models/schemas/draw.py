@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, ConfigDict
+
+class RaffleDraw(BaseModel):
+    """How a raffle's winner is (or will be) drawn; see app/services/draws.py."""
+    raffle_id: int
+    seed_hash: str
+    committed_at: datetime
+    seed: Optional[str] = None  # Revealed by the draw
+    revealed_at: Optional[datetime] = None
+    purchase_count: Optional[int] = None
+    total_tickets: Optional[int] = None
+    tickets_digest: Optional[str] = None
+    winning_ticket: Optional[int] = None
+    winning_purchase_id: Optional[int] = None
+    winner_id: Optional[int] = None
+    model_config = ConfigDict(from_attributes=True)
@@ -1,15 +1,22 @@
+from datetime import datetime
 from typing import Optional
 from pydantic import BaseModel, ConfigDict
+from app.core.money import Cents
+from app.models.schemas.purchase import PurchaseItems
 
 class PaymentIntentCreate(BaseModel):
     raffle_id: int
     quantity: int
 
+class PaymentBatchIntentCreate(PurchaseItems):
+    pass
+
 class PaymentIntentResponse(BaseModel):
     client_secret: str
     payment_intent_id: str
-    amount: float
+    amount_cents: Cents
     currency: str
+    hold_expires_at: datetime  # The tickets are released if not bought by then
     model_config = ConfigDict(from_attributes=True)
 
 class PaymentConfirmation(BaseModel):
@@ -17,12 +24,12 @@ class PaymentConfirmation(BaseModel):
 
 class PaymentRefund(BaseModel):
     payment_intent_id: str
-    amount: Optional[float] = None
+    amount_cents: Optional[Cents] = None  # Default: the full amount
 
 class PaymentRefundResponse(BaseModel):
     refund_id: str
     status: str
-    amount: float
+    amount_cents: Cents
     model_config = ConfigDict(from_attributes=True)
 
 class WebhookEvent(BaseModel):
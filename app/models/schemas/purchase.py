@@ -1,20 +1,39 @@
 from datetime import datetime
-from decimal import Decimal
-from typing import Optional
-from pydantic import BaseModel, ConfigDict
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from app.core.config import settings
+from app.core.money import Cents
 
 class PurchaseBase(BaseModel):
     raffle_id: int
     quantity: int
-    total_amount: Decimal
+    total_amount_cents: Cents
     payment_intent_id: str
 
 class PurchaseCreate(PurchaseBase):
     pass
 
+class PurchaseItem(BaseModel):
+    raffle_id: int
+    quantity: int = Field(gt=0)
+
+class PurchaseItems(BaseModel):
+    items: List[PurchaseItem] = Field(min_length=1, max_length=settings.CHECKOUT_MAX_ITEMS)
+
+    @field_validator("items")
+    @classmethod
+    def one_item_per_raffle(cls, items: List[PurchaseItem]) -> List[PurchaseItem]:
+        if len({item.raffle_id for item in items}) < len(items):
+            raise ValueError("Each raffle may appear only once")
+        return items
+
+class PurchaseBatchCreate(PurchaseItems):
+    total_amount_cents: Cents  # Of all items
+    payment_intent_id: str
+
 class PurchaseUpdate(BaseModel):
     quantity: Optional[int] = None
-    total_amount: Optional[Decimal] = None
+    total_amount_cents: Optional[Cents] = None
     transaction_id: Optional[str] = None
 
 class PurchaseInDBBase(PurchaseBase):
@@ -1,12 +1,12 @@
 from datetime import datetime
-from decimal import Decimal
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, ConfigDict
+from app.core.money import Cents
 
 class RaffleBase(BaseModel):
     title: str
     description: Optional[str] = None
-    ticket_price: Decimal
+    ticket_price_cents: Cents
     total_tickets: int
     end_date: datetime
 
@@ -16,7 +16,7 @@ class RaffleCreate(RaffleBase):
 class RaffleUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
-    ticket_price: Optional[Decimal] = None
+    ticket_price_cents: Optional[Cents] = None
     total_tickets: Optional[int] = None
     end_date: Optional[datetime] = None
     is_active: Optional[bool] = None
@@ -24,6 +24,7 @@ class RaffleUpdate(BaseModel):
 class RaffleInDBBase(RaffleBase):
     id: int
     tickets_sold: int
+    tickets_held: int = 0  # Reserved by pending checkouts
     start_date: datetime
     is_active: bool
     winner_id: Optional[int] = None
@@ -34,3 +35,10 @@ class Raffle(RaffleInDBBase):
 
 class RaffleInDB(RaffleInDBBase):
     pass
+
+class RaffleSearchResult(Raffle):
+    rank: Optional[float] = None  # Relevance to q, on Postgres
+
+class RaffleSearchResults(BaseModel):
+    raffles: List[RaffleSearchResult]
+    next_cursor: Optional[str] = None  # Pass as cursor for the next page; None on the last
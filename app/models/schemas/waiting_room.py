@@ -0,0 +1,19 @@
+from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+
+class WaitingRoomUpdate(BaseModel):
+    rate: float = Field(gt=0)  # Users admitted per second
+
+class WaitingRoom(WaitingRoomUpdate):
+    raffle_id: int
+    model_config = ConfigDict(from_attributes=True)
+
+class QueueStatus(BaseModel):
+    raffle_id: int
+    position: int  # Users still to be admitted ahead of this one
+    wait_seconds: float
+    admitted: bool
+    expires_in: Optional[float] = None  # Seconds left to check out once admitted
+
+class QueueTicket(QueueStatus):
+    token: str  # Sent back as the X-Admission-Token header
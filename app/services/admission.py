@@ -0,0 +1,134 @@
+import asyncio
+import math
+import time
+from typing import Any, Dict, Optional
+from jose import jwt
+from sqlalchemy import case, delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.domain.waiting_room import WaitingRoom, WaitingRoomSlot
+
+class AdmissionControl:
+    """
+    Virtual waiting rooms in front of checkout.
+    Joining a raffle's queue is one atomic update that books the next
+    admission slot, 1 / rate seconds after the previous one (or now when
+    the queue is empty). The slot is returned in a signed token, so
+    checking admission on checkout needs no database access. A user holds
+    at most one slot per raffle: joining again before it expires hands
+    back the same one, so nobody can hoard places. Each worker keeps its
+    own copy of which raffles have a waiting room, reloaded every
+    ADMISSION_REFRESH_INTERVAL seconds.
+    """
+    def __init__(self) -> None:
+        self.rates: Dict[int, float] = {}
+
+    def rate(self, raffle_id: int) -> Optional[float]:
+        """Admissions per second, or None when the raffle has no waiting room."""
+        return self.rates.get(raffle_id)
+
+    async def load(self, db: AsyncSession) -> None:
+        result = await db.execute(select(WaitingRoom.raffle_id, WaitingRoom.rate))
+        self.rates = dict(result.all())
+
+    async def join(self, db: AsyncSession, raffle_id: int, user_id: Any) -> Optional[Dict[str, Any]]:
+        """
+        Queue user_id for raffle_id, or hand back their place if they hold
+        one that hasn't expired; None when the raffle has no waiting room.
+        """
+        now = time.time()
+        slot = (await db.execute(
+            select(WaitingRoomSlot.id, WaitingRoomSlot.admit_at, WaitingRoomSlot.expires_at)
+            .where(WaitingRoomSlot.raffle_id == raffle_id, WaitingRoomSlot.user_id == user_id)
+        )).first()
+        if slot and slot.expires_at > now:
+            metrics.increment("admission.rejoined")
+            return self._ticket(raffle_id, user_id, slot.admit_at, now)
+
+        next_admission = await db.scalar(
+            update(WaitingRoom)
+            .where(WaitingRoom.raffle_id == raffle_id)
+            .values(next_admission=case(
+                (WaitingRoom.next_admission > now, WaitingRoom.next_admission),
+                else_=now
+            ) + 1.0 / WaitingRoom.rate)
+            .returning(WaitingRoom.next_admission - 1.0 / WaitingRoom.rate)
+        )
+        if next_admission is None:
+            return None
+        expires_at = math.ceil(next_admission + settings.ADMISSION_WINDOW_SECONDS)
+        try:
+            if slot:
+                # Only an expired slot is replaced; a concurrent join may have renewed it
+                result = await db.execute(
+                    update(WaitingRoomSlot)
+                    .where(WaitingRoomSlot.id == slot.id, WaitingRoomSlot.expires_at <= now)
+                    .values(admit_at=next_admission, expires_at=expires_at)
+                )
+                claimed = result.rowcount == 1
+            else:
+                await db.execute(insert(WaitingRoomSlot).values(
+                    raffle_id=raffle_id, user_id=user_id, admit_at=next_admission, expires_at=expires_at
+                ))
+                claimed = True
+        except IntegrityError:
+            claimed = False
+        if not claimed:
+            # A concurrent join by the same user won; give back the place
+            # booked here and hand back theirs
+            await db.rollback()
+            return await self.join(db, raffle_id, user_id)
+        await db.commit()
+        metrics.increment("admission.joined")
+        return self._ticket(raffle_id, user_id, next_admission, now)
+
+    def _ticket(self, raffle_id: int, user_id: Any, admit_at: float, now: float) -> Dict[str, Any]:
+        """Signed token for a slot, with its queue status."""
+        claims = {
+            "sub": str(user_id),
+            "raffle_id": raffle_id,
+            "admit_at": admit_at,
+            "exp": math.ceil(admit_at + settings.ADMISSION_WINDOW_SECONDS),
+        }
+        token = jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+        return {"token": token, **self.status(claims, now)}
+
+    def read_token(self, token: str) -> Optional[Dict[str, Any]]:
+        """Claims of a valid, unexpired admission token."""
+        try:
+            claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except jwt.JWTError:
+            return None
+        return claims if "admit_at" in claims else None
+
+    def status(self, claims: Dict[str, Any], now: Optional[float] = None) -> Dict[str, Any]:
+        now = time.time() if now is None else now
+        wait = max(claims["admit_at"] - now, 0.0)
+        rate = self.rate(claims["raffle_id"])
+        return {
+            "raffle_id": claims["raffle_id"],
+            # Slots are 1 / rate apart, so the wait tells how many are ahead
+            "position": math.ceil(wait * rate) if rate else 0,
+            "wait_seconds": round(wait, 3),
+            "admitted": wait == 0,
+            "expires_in": round(claims["exp"] - now, 3) if wait == 0 else None,
+        }
+
+    async def maintain(self, sessions: async_sessionmaker) -> None:
+        """
+        Reload waiting rooms and delete expired slots periodically; run as
+        a background task.
+        """
+        while True:
+            try:
+                async with sessions() as db:
+                    await self.load(db)
+                    await db.execute(delete(WaitingRoomSlot).where(WaitingRoomSlot.expires_at <= time.time()))
+                    await db.commit()
+            except Exception:
+                metrics.increment("admission.refresh_failures")
+            await asyncio.sleep(settings.ADMISSION_REFRESH_INTERVAL)
+
+admission_control = AdmissionControl()
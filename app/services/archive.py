@@ -0,0 +1,247 @@
+import asyncio
+import csv
+import gzip
+import io
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.core.money import to_cents
+from app.models.domain.archive import ArchivedParticipation, ArchivedRaffle
+from app.models.domain.purchase import Purchase
+from app.models.domain.raffle import Raffle
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet archives are optional
+    pyarrow = None
+
+COLUMNS = ["id", "user_id", "raffle_id", "quantity", "total_amount_cents", "transaction_id", "purchase_date"]
+PARSERS = {
+    "id": int,
+    "user_id": int,
+    "raffle_id": int,
+    "quantity": int,
+    "total_amount_cents": int,
+    # Files archived before amounts were kept in cents
+    "total_amount": to_cents,
+    "transaction_id": str,
+    "purchase_date": datetime.fromisoformat,
+}
+
+def _in_cents(row: Dict[str, Any]) -> Dict[str, Any]:
+    """row with total_amount_cents, also when read from a file archived before cents."""
+    if "total_amount" in row:
+        row = dict(row)
+        amount = row.pop("total_amount")
+        row["total_amount_cents"] = amount if isinstance(amount, int) else to_cents(amount)
+    return row
+
+class CsvBucketWriter:
+    """Gzipped CSV file with a header row."""
+    suffix = ".csv.gz"
+
+    def __init__(self, path: Path) -> None:
+        self._file = io.TextIOWrapper(gzip.open(path, "wb"), newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(COLUMNS)
+
+    def write(self, rows: Sequence[Sequence[Any]]) -> None:
+        self._writer.writerows(
+            [value.isoformat() if isinstance(value, datetime) else value for value in row]
+            for row in rows
+        )
+
+    def close(self) -> None:
+        self._file.close()
+
+    @staticmethod
+    def read(path: Path, user_id: int) -> Iterator[Dict[str, Any]]:
+        with io.TextIOWrapper(gzip.open(path, "rb"), newline="") as f:
+            for row in csv.DictReader(f):
+                if int(row["user_id"]) == user_id:
+                    yield {name: PARSERS[name](value) for name, value in row.items()}
+
+class ParquetBucketWriter:
+    """Parquet file written one row group per chunk."""
+    suffix = ".parquet"
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._writer = None
+
+    def write(self, rows: Sequence[Sequence[Any]]) -> None:
+        table = pyarrow.Table.from_pylist([dict(zip(COLUMNS, row)) for row in rows])
+        if self._writer is None:
+            self._writer = pyarrow.parquet.ParquetWriter(self._path, table.schema, compression="zstd")
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+    @staticmethod
+    def read(path: Path, user_id: int) -> Iterator[Dict[str, Any]]:
+        table = pyarrow.parquet.read_table(path, filters=[("user_id", "=", user_id)])
+        yield from table.to_pylist()
+
+WRITERS = {"csv": CsvBucketWriter, "parquet": ParquetBucketWriter}
+
+class PurchaseArchive:
+    """
+    Purchases of archived raffles, stored as files under root:
+    root/raffle_<id>/bucket_<user_id % buckets><suffix>, so reading one
+    user's history of a raffle opens a single small file.
+    """
+    def __init__(self, root: str, file_format: str, buckets: int, batch_size: int) -> None:
+        if file_format == "parquet" and pyarrow is None:
+            raise RuntimeError("ARCHIVE_FORMAT=parquet requires pyarrow")
+        self.root = Path(root)
+        self.writer = WRITERS[file_format]
+        self.buckets = buckets
+        self.batch_size = batch_size
+
+    def raffle_dir(self, raffle_id: int) -> Path:
+        return self.root / f"raffle_{raffle_id}"
+
+    def bucket_path(self, directory: Path, user_id: int) -> Path:
+        return directory / f"bucket_{user_id % self.buckets:03d}{self.writer.suffix}"
+
+    async def write_raffle(self, engine: AsyncEngine, raffle_id: int) -> int:
+        """
+        Stream a raffle's purchases into its bucket files; returns the row count.
+        Files are written to a temporary directory that is renamed into
+        place once complete, so a crash never leaves a partial archive.
+        """
+        final = self.raffle_dir(raffle_id)
+        staging = final.with_name(final.name + ".tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        writers: Dict[int, Any] = {}
+        count = 0
+        query = (
+            select(*(getattr(Purchase, name) for name in COLUMNS))
+            .where(Purchase.in_raffle(raffle_id))
+            .execution_options(yield_per=self.batch_size)
+        )
+        try:
+            async with engine.connect() as conn:
+                result = await conn.stream(query)
+                async for rows in result.partitions():
+                    chunks: Dict[int, List[Any]] = {}
+                    for row in rows:
+                        chunks.setdefault(row.user_id % self.buckets, []).append(row)
+                    for bucket, chunk in chunks.items():
+                        if bucket not in writers:
+                            writers[bucket] = self.writer(self.bucket_path(staging, chunk[0].user_id))
+                        await asyncio.to_thread(writers[bucket].write, chunk)
+                    count += len(rows)
+        finally:
+            for writer in writers.values():
+                writer.close()
+        shutil.rmtree(final, ignore_errors=True)
+        staging.rename(final)
+        return count
+
+    def _read_user(self, user_id: int, raffle_ids: Sequence[int], limit: int) -> List[Dict[str, Any]]:
+        purchases: List[Dict[str, Any]] = []
+        for raffle_id in raffle_ids:
+            path = self.bucket_path(self.raffle_dir(raffle_id), user_id)
+            if path.exists():
+                rows = sorted(self.writer.read(path, user_id), key=lambda row: row["purchase_date"], reverse=True)
+                # Shaped like the Purchase schema
+                purchases.extend(
+                    {**_in_cents(row), "payment_intent_id": row["transaction_id"]} for row in rows
+                )
+            if len(purchases) >= limit:
+                break
+        return purchases[:limit]
+
+    async def read_user_purchases(self, user_id: int, raffle_ids: Sequence[int], limit: int) -> List[Dict[str, Any]]:
+        """Up to limit archived purchases of user_id, in raffle_ids order."""
+        return await asyncio.to_thread(self._read_user, user_id, raffle_ids, limit)
+
+purchase_archive = PurchaseArchive(
+    settings.ARCHIVE_DIR,
+    settings.ARCHIVE_FORMAT,
+    settings.ARCHIVE_BUCKETS,
+    settings.ARCHIVE_BATCH_SIZE,
+)
+
+async def archive_raffle(engine: AsyncEngine, raffle: Raffle, archive: PurchaseArchive = purchase_archive) -> int:
+    """
+    Move one closed raffle and its purchases out of the hot tables.
+    Purchases are written to files first, then the raffle is recorded as
+    archived, then rows are deleted in batches of archive.batch_size, each
+    in its own short transaction. Re-running after a crash resumes the
+    deletes. Returns the number of purchases deleted.
+    """
+    async with engine.begin() as conn:
+        archived = await conn.scalar(select(ArchivedRaffle.id).where(ArchivedRaffle.id == raffle.id))
+    if archived is None:
+        purchase_count = await archive.write_raffle(engine, raffle.id)
+        async with engine.begin() as conn:
+            await conn.execute(insert(ArchivedRaffle).values(
+                id=raffle.id,
+                title=raffle.title,
+                ticket_price_cents=raffle.ticket_price_cents,
+                total_tickets=raffle.total_tickets,
+                tickets_sold=raffle.tickets_sold,
+                start_date=raffle.start_date,
+                end_date=raffle.end_date,
+                winner_id=raffle.winner_id,
+                purchase_count=purchase_count,
+                location=str(archive.raffle_dir(raffle.id)),
+            ))
+            await conn.execute(insert(ArchivedParticipation).from_select(
+                ["user_id", "raffle_id", "purchases", "tickets", "amount_cents"],
+                select(
+                    Purchase.user_id,
+                    Purchase.raffle_id,
+                    func.count(),
+                    func.sum(Purchase.quantity),
+                    func.sum(Purchase.total_amount_cents),
+                )
+                .where(Purchase.in_raffle(raffle.id))
+                .group_by(Purchase.user_id, Purchase.raffle_id)
+            ))
+
+    deleted = 0
+    while True:
+        # Short transactions keep row locks brief and let checkout interleave
+        async with engine.begin() as conn:
+            batch = select(Purchase.id).where(Purchase.in_raffle(raffle.id)).limit(archive.batch_size)
+            result = await conn.execute(
+                delete(Purchase).where(Purchase.raffle_id == raffle.id, Purchase.id.in_(batch))
+            )
+        deleted += result.rowcount
+        if result.rowcount < archive.batch_size:
+            break
+    async with engine.begin() as conn:
+        await conn.execute(delete(Raffle).where(Raffle.id == raffle.id))
+    return deleted
+
+async def archive_closed_raffles(
+    engine: AsyncEngine,
+    older_than_days: Optional[int] = None,
+    archive: PurchaseArchive = purchase_archive
+) -> Dict[int, int]:
+    """
+    Archive every raffle that is closed, has a winner and ended more than
+    older_than_days ago. Returns purchases deleted per raffle id.
+    """
+    days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    async with AsyncSession(engine) as session:
+        raffles = (await session.scalars(
+            select(Raffle)
+            .where(Raffle.is_active == False, Raffle.winner_id.is_not(None), Raffle.end_date < cutoff)
+            .order_by(Raffle.end_date)
+        )).all()
+    return {raffle.id: await archive_raffle(engine, raffle, archive) for raffle in raffles}
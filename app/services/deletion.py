@@ -0,0 +1,57 @@
+import asyncio
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.domain.draw import RaffleDraw
+from app.models.domain.purchase import Purchase
+from app.models.domain.raffle import Raffle
+
+async def purge_deleted_raffles(db: AsyncSession) -> int:
+    """
+    Delete up to PURGE_BATCH_SIZE purchases of the longest-deleted raffle,
+    and the raffle itself once none are left, then commit. Returns the
+    number of rows deleted.
+    Deleted raffles are found through the deleted_at partial index. A
+    raffle another worker is purging is skipped rather than waited on.
+    Each batch is its own short transaction, so purchase row locks stay
+    brief and checkout interleaves. Holds and the waiting room go with the
+    raffle by cascade.
+    """
+    raffle_id = await db.scalar(
+        select(Raffle.id)
+        .where(Raffle.deleted_at.is_not(None))
+        .order_by(Raffle.deleted_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    if raffle_id is None:
+        await db.commit()
+        return 0
+    batch = select(Purchase.id).where(Purchase.in_raffle(raffle_id)).limit(settings.PURGE_BATCH_SIZE)
+    result = await db.execute(
+        delete(Purchase).where(Purchase.raffle_id == raffle_id, Purchase.id.in_(batch))
+    )
+    deleted = result.rowcount
+    if deleted < settings.PURGE_BATCH_SIZE:
+        await db.execute(delete(RaffleDraw).where(RaffleDraw.raffle_id == raffle_id))
+        await db.execute(delete(Raffle).where(Raffle.id == raffle_id))
+        deleted += 1
+        metrics.increment("deletion.raffles_purged")
+    await db.commit()
+    metrics.increment("deletion.rows_purged", deleted)
+    return deleted
+
+async def sweep_deleted_raffles(sessions: async_sessionmaker) -> None:
+    """
+    Purge deleted raffles every PURGE_INTERVAL seconds, a batch at a time
+    until none are left; run as a background task.
+    """
+    while True:
+        try:
+            async with sessions() as db:
+                while await purge_deleted_raffles(db):
+                    pass
+        except Exception:
+            metrics.increment("deletion.purge_failures")
+        await asyncio.sleep(settings.PURGE_INTERVAL)
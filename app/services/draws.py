@@ -0,0 +1,307 @@
+"""
+Provably fair winner draws by commit-reveal.
+
+When a raffle is created, a random 32-byte seed is generated and
+sha256(seed) is published as its seed_hash. Once the raffle has ended, the
+draw repeats these steps, and anyone holding the published values can
+check them:
+
+1. List the raffle's purchases in canonical order, (purchase_date, id).
+   Ticket numbers are handed out in that order, quantity per purchase,
+   starting from 0.
+2. tickets_digest is the sha256 of one "<purchase id>:<user id>:<quantity>\\n"
+   line per purchase, in that order.
+3. winning_ticket = HMAC-SHA256(key=seed, message="<raffle id>:<total
+   tickets>:<tickets_digest>"), read as a big-endian integer, modulo total
+   tickets.
+4. The winner is the buyer of the purchase holding winning_ticket.
+
+The seed is fixed before any ticket is sold and the tickets are fixed
+before the seed is revealed, so neither can be chosen to steer the result.
+"""
+import asyncio
+import bisect
+import hashlib
+import hmac
+import secrets
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import String, case, cast, func, literal, select, true, tuple_, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.domain.draw import RaffleDraw
+from app.models.domain.purchase import Purchase
+from app.models.domain.raffle import Raffle
+from app.services.notifications import notification_service
+from app.services.notification_templates import NotificationTemplate
+
+def hash_seed(seed: str) -> str:
+    return hashlib.sha256(bytes.fromhex(seed)).hexdigest()
+
+def commit_seed(raffle_id: int) -> RaffleDraw:
+    """A new draw for raffle_id with a fresh secret seed, for the caller to add."""
+    seed = secrets.token_hex(32)
+    return RaffleDraw(
+        raffle_id=raffle_id,
+        seed=seed,
+        seed_hash=hash_seed(seed),
+        committed_at=datetime.utcnow()
+    )
+
+def winning_ticket(seed: str, raffle_id: int, total_tickets: int, tickets_digest: str) -> int:
+    message = f"{raffle_id}:{total_tickets}:{tickets_digest}".encode()
+    value = hmac.new(bytes.fromhex(seed), message, hashlib.sha256).digest()
+    # 256 bits modulo at most billions of tickets: the bias is negligible
+    return int.from_bytes(value, "big") % total_tickets
+
+@dataclass
+class TicketLedger:
+    """A raffle's tickets in canonical order, summarised."""
+    purchase_count: int = 0
+    total_tickets: int = 0
+    digest: str = ""
+    # First ticket of each batch read, and the (purchase_date, id) the batch
+    # follows (None for the first)
+    checkpoints: List[Tuple[int, Optional[Tuple[datetime, int]]]] = field(default_factory=list)
+
+def _purchases_after(raffle_id: int, after: Optional[Tuple[datetime, int]]):
+    """One batch of a raffle's purchases in canonical order, following after."""
+    query = (
+        select(Purchase.id, Purchase.user_id, Purchase.quantity, Purchase.purchase_date)
+        .where(Purchase.in_raffle(raffle_id))
+        .order_by(Purchase.purchase_date, Purchase.id)
+        .limit(settings.DRAW_BATCH_SIZE)
+    )
+    if after is not None:
+        query = query.where(tuple_(Purchase.purchase_date, Purchase.id) > after)
+    return query
+
+def _summarise(batch):
+    """The batch's digest lines, concatenated in order by Postgres, with its totals."""
+    line = (
+        cast(batch.c.id, String) + ":" + cast(batch.c.user_id, String) + ":"
+        + cast(batch.c.quantity, String) + "\n"
+    )
+    lines = func.string_agg(line, aggregate_order_by(literal(""), batch.c.purchase_date, batch.c.id))
+    last = (
+        select(batch.c.purchase_date, batch.c.id)
+        .order_by(batch.c.purchase_date.desc(), batch.c.id.desc())
+        .limit(1)
+        .subquery()
+    )
+    totals = (
+        select(lines.label("lines"), func.count().label("purchases"), func.sum(batch.c.quantity).label("tickets"))
+        .select_from(batch)
+        .subquery()
+    )
+    # Both sides are a single row; no row at all when the batch is empty
+    return select(totals, last).select_from(totals.join(last, true()))
+
+async def _read_batch(
+    db: AsyncSession,
+    raffle_id: int,
+    after: Optional[Tuple[datetime, int]]
+) -> Optional[Tuple[str, int, int, Tuple[datetime, int]]]:
+    """
+    The digest lines, purchase count, ticket count and last (purchase_date,
+    id) of the batch following after, or None when it is empty.
+    """
+    if db.bind.dialect.name == "postgresql":
+        row = (await db.execute(_summarise(_purchases_after(raffle_id, after).cte()))).first()
+        if row is None or not row.purchases:
+            return None
+        return row.lines, row.purchases, row.tickets, (row.purchase_date, row.id)
+    # Elsewhere an aggregate's input order isn't guaranteed, so the rows
+    # are read in canonical order and joined here
+    rows = (await db.execute(_purchases_after(raffle_id, after))).all()
+    if not rows:
+        return None
+    lines = "".join(f"{row.id}:{row.user_id}:{row.quantity}\n" for row in rows)
+    return lines, len(rows), sum(row.quantity for row in rows), (rows[-1].purchase_date, rows[-1].id)
+
+async def scan_tickets(db: AsyncSession, raffle_id: int) -> TicketLedger:
+    """
+    Summarise a raffle's tickets, DRAW_BATCH_SIZE purchases per query.
+    On Postgres each batch comes back as a single row, with its digest
+    lines already joined, so memory stays flat and little is sent however
+    many tickets were sold.
+    """
+    ledger = TicketLedger()
+    digest = hashlib.sha256()
+    after = None
+    while True:
+        batch = await _read_batch(db, raffle_id, after)
+        if batch is None:
+            break
+        lines, purchases, tickets, last = batch
+        ledger.checkpoints.append((ledger.total_tickets, after))
+        digest.update(lines.encode())
+        ledger.purchase_count += purchases
+        ledger.total_tickets += tickets
+        after = last
+        if purchases < settings.DRAW_BATCH_SIZE:
+            break
+    ledger.digest = digest.hexdigest()
+    return ledger
+
+async def find_ticket(db: AsyncSession, raffle_id: int, ledger: TicketLedger, ticket: int) -> Tuple[int, int]:
+    """Purchase id and user id holding ticket, reading only the batch it falls in."""
+    batch = bisect.bisect_right([first for first, _ in ledger.checkpoints], ticket) - 1
+    first, after = ledger.checkpoints[batch]
+    for row in await db.execute(_purchases_after(raffle_id, after)):
+        if ticket < first + row.quantity:
+            return row.id, row.user_id
+        first += row.quantity
+    raise RuntimeError(f"Ticket {ticket} of raffle {raffle_id} not found; purchases changed during the draw")
+
+async def _tally(db: AsyncSession, raffle_id: int, seed: str) -> Optional[Dict[str, Any]]:
+    """The draw's outcome as RaffleDraw column values, or None when the raffle has no tickets."""
+    ledger = await scan_tickets(db, raffle_id)
+    if not ledger.total_tickets:
+        return None
+    ticket = winning_ticket(seed, raffle_id, ledger.total_tickets, ledger.digest)
+    winning_purchase_id, winner_id = await find_ticket(db, raffle_id, ledger, ticket)
+    return {
+        "purchase_count": ledger.purchase_count,
+        "total_tickets": ledger.total_tickets,
+        "tickets_digest": ledger.digest,
+        "winning_ticket": ticket,
+        "winning_purchase_id": winning_purchase_id,
+        "winner_id": winner_id,
+        "revealed_at": datetime.utcnow(),
+    }
+
+async def draw_winner(db: AsyncSession, raffle_id: int) -> Optional[RaffleDraw]:
+    """
+    Draw raffle_id's winner, in the caller's transaction, and record and
+    reveal how. None when the raffle has no tickets.
+    The caller must keep purchases of the raffle from changing meanwhile,
+    e.g. by locking its row. A raffle created before seeds were committed
+    gets one now; its committed_at shows the seed was chosen late.
+    """
+    draw = await db.scalar(
+        select(RaffleDraw).where(RaffleDraw.raffle_id == raffle_id).with_for_update()
+    )
+    if draw is None:
+        draw = commit_seed(raffle_id)
+        db.add(draw)
+    outcome = await _tally(db, raffle_id, draw.seed)
+    if outcome is None:
+        return None
+    for name, value in outcome.items():
+        setattr(draw, name, value)
+    metrics.increment("draws.completed")
+    return draw
+
+async def draw_ended_raffles(sessions: async_sessionmaker, now: Optional[datetime] = None) -> Dict[int, Optional[int]]:
+    """
+    Draw up to DRAW_BATCH_RAFFLES raffles that ended before now without a
+    winner, oldest first, and commit. Returns the winner id of each raffle
+    closed; None for one that sold no tickets and closed without a winner.
+    Ended raffles are found through the active end_date index. Raffles
+    another worker is drawing, or with a purchase in flight, are skipped
+    rather than waited on. The raffle rows stay locked until the batch
+    commits, so sales are held off while DRAW_CONCURRENCY ticket scans run
+    at a time, each on its own connection. Every result is written in the
+    transaction holding the locks. A raffle whose scan fails stays open
+    for the next run.
+    """
+    async with sessions() as db:
+        result = await db.execute(
+            select(Raffle.id, Raffle.title)
+            .where(
+                Raffle.is_active,
+                Raffle.winner_id.is_(None),
+                Raffle.end_date <= (now or datetime.utcnow())
+            )
+            .order_by(Raffle.end_date)
+            .limit(settings.DRAW_BATCH_RAFFLES)
+            .with_for_update(skip_locked=True)
+        )
+        titles = dict(result.all())
+        if not titles:
+            return {}
+        draws = {
+            draw.raffle_id: draw
+            for draw in await db.scalars(
+                select(RaffleDraw).where(RaffleDraw.raffle_id.in_(list(titles))).with_for_update()
+            )
+        }
+        for raffle_id in titles.keys() - draws.keys():
+            draws[raffle_id] = commit_seed(raffle_id)
+            db.add(draws[raffle_id])
+
+        scans = asyncio.Semaphore(settings.DRAW_CONCURRENCY)
+
+        async def tally(raffle_id: int) -> Optional[Dict[str, Any]]:
+            async with scans, sessions() as scan:
+                return await _tally(scan, raffle_id, draws[raffle_id].seed)
+
+        outcomes = await asyncio.gather(*(tally(raffle_id) for raffle_id in titles), return_exceptions=True)
+        winners = {}
+        for raffle_id, outcome in zip(titles, outcomes):
+            if isinstance(outcome, Exception):
+                metrics.increment("draws.failures")
+                continue
+            if outcome is not None:
+                for name, value in outcome.items():
+                    setattr(draws[raffle_id], name, value)
+            winners[raffle_id] = outcome and outcome["winner_id"]
+        if winners:
+            await db.execute(
+                update(Raffle)
+                .where(Raffle.id.in_(list(winners)))
+                .values(
+                    winner_id=case(winners, value=Raffle.id),
+                    is_active=False
+                )
+                .execution_options(synchronize_session=False)
+            )
+        await db.commit()
+    metrics.increment("draws.completed", sum(1 for winner_id in winners.values() if winner_id))
+
+    await asyncio.gather(*(
+        notification_service.trigger_event(
+            name=NotificationTemplate.RAFFLE_WINNER,
+            subscriber_id=winner_id,
+            payload={"raffle_title": titles[raffle_id]}
+        )
+        for raffle_id, winner_id in winners.items() if winner_id
+    ))
+    return winners
+
+async def maintain_draws(sessions: async_sessionmaker) -> None:
+    """
+    Draw the winners of ended raffles every DRAW_INTERVAL seconds, a batch
+    at a time until none are left; run as a background task.
+    """
+    while True:
+        try:
+            while len(await draw_ended_raffles(sessions)) == settings.DRAW_BATCH_RAFFLES:
+                pass
+        except Exception:
+            metrics.increment("draws.job_failures")
+        await asyncio.sleep(settings.DRAW_INTERVAL)
+
+async def verify_draw(db: AsyncSession, draw: RaffleDraw) -> Dict[str, bool]:
+    """
+    Repeat a revealed draw from the purchases, in db's transaction. Each
+    check is True when it matches the record.
+    """
+    ledger = await scan_tickets(db, draw.raffle_id)
+    checks = {
+        "seed_hash": hash_seed(draw.seed) == draw.seed_hash,
+        "tickets": (ledger.purchase_count, ledger.total_tickets, ledger.digest)
+            == (draw.purchase_count, draw.total_tickets, draw.tickets_digest),
+        "winning_ticket": False,
+        "winner": False,
+    }
+    if ledger.total_tickets:
+        ticket = winning_ticket(draw.seed, draw.raffle_id, ledger.total_tickets, ledger.digest)
+        checks["winning_ticket"] = ticket == draw.winning_ticket
+        holder = await find_ticket(db, draw.raffle_id, ledger, ticket)
+        checks["winner"] = holder == (draw.winning_purchase_id, draw.winner_id)
+    return checks
@@ -0,0 +1,78 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, AsyncIterator, Sequence
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def _encode_csv(columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(
+        [value.isoformat() if isinstance(value, datetime) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue().encode()
+
+def _encode_ndjson(columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> bytes:
+    return "".join(
+        json.dumps(dict(zip(columns, row)), default=_json_value) + "\n"
+        for row in rows
+    ).encode()
+
+ENCODERS = {
+    ExportFormat.CSV: _encode_csv,
+    ExportFormat.NDJSON: _encode_ndjson,
+}
+
+async def stream_export(
+    db: AsyncSession,
+    query: Select,
+    file_format: ExportFormat,
+    compress: bool = False
+) -> AsyncIterator[bytes]:
+    """
+    Encode query's rows as they come off a server-side cursor.
+    Only settings.EXPORT_BATCH_SIZE rows are held at a time, so memory stays
+    flat however many rows match. With compress, the output is one gzip
+    stream, flushed per chunk.
+    """
+    columns = [column.name for column in query.selected_columns]
+    encode = ENCODERS[file_format]
+    gzip = zlib.compressobj(settings.EXPORT_GZIP_LEVEL, wbits=31) if compress else None
+
+    def output(data: bytes) -> bytes:
+        return gzip.compress(data) + gzip.flush(zlib.Z_SYNC_FLUSH) if gzip else data
+
+    if file_format == ExportFormat.CSV:
+        yield output(_encode_csv(columns, [columns]))
+    result = await db.stream(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+    async for rows in result.partitions():
+        metrics.increment("exports.rows", len(rows))
+        yield output(encode(columns, rows))
+    if gzip:
+        yield gzip.flush()
@@ -0,0 +1,280 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Dict, List, Optional, Sequence
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+from sqlalchemy import Float, cast, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.resilience import Dependency, DependencyUnavailableError
+from app.models.domain.raffle import Raffle
+from app.services.inventory import inventory_hub
+
+# Guard for Redis calls; see app.core.resilience
+redis_dependency = Dependency(
+    "redis",
+    timeout=settings.REDIS_TIMEOUT,
+    max_concurrency=settings.REDIS_MAX_CONCURRENCY,
+    failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=settings.CIRCUIT_RESET_TIMEOUT,
+    retries=settings.RETRY_ATTEMPTS,
+    backoff=settings.RETRY_BACKOFF,
+    failure_exceptions=(RedisError,),
+)
+
+# Lets one worker rebuild the feeds at a time (arbitrary, app-wide)
+FEEDS_LOCK_ID = 0x66656564
+
+# Members written per ZADD while rebuilding
+REBUILD_CHUNK_SIZE = 10000
+
+class Feed(str, Enum):
+    ENDING_SOON = "ending-soon"
+    POPULAR = "popular"
+    NEARLY_SOLD_OUT = "nearly-sold-out"
+
+# Feeds ranked by ticket sales, which drop raffles as soon as they end;
+# ending-soon keeps them, below its read range, until they are drawn
+RANKED_FEEDS = (Feed.POPULAR, Feed.NEARLY_SOLD_OUT)
+
+def _timestamp(value: datetime) -> float:
+    """Unix seconds of a naive UTC datetime."""
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+def _share_left(tickets_sold: Optional[int], tickets_held: int, total_tickets: int) -> float:
+    """Share of a raffle's tickets neither sold nor held, 0 to 1."""
+    if not total_tickets:
+        return 0.0
+    return max(total_tickets - (tickets_sold or 0) - tickets_held, 0) / total_tickets
+
+class RaffleFeeds:
+    """
+    Storefront feeds of open raffles, kept as one Redis sorted set of
+    raffle ids per feed:
+    - ending-soon, scored by end_date;
+    - popular, scored by tickets sold;
+    - nearly-sold-out, scored by the share of tickets left.
+    A page is one ZRANGE, O(log n + limit), instead of sorting raffle on
+    every request.
+    Every worker records the inventory changes it hears and writes them
+    every FEED_FLUSH_INTERVAL seconds, in one pipeline. Writes are
+    idempotent, so it doesn't matter that all workers write the same
+    change. One worker at a time rewrites the feeds from raffle every
+    FEED_REBUILD_INTERVAL seconds, and whenever Redis has lost them, which
+    repairs any drift.
+    A raffle that has ended stays open until it is drawn. Each flush
+    drops it from the ranked feeds, found by its ending-soon score.
+    """
+    def __init__(self, client: redis.Redis, prefix: str = "feeds") -> None:
+        self.client = client
+        self.keys = {feed: f"{prefix}:{feed.value}" for feed in Feed}
+        # Present once the feeds have been written in full
+        self.built_key = f"{prefix}:built"
+        self._pending: Dict[int, Dict[str, Any]] = {}
+
+    def record(self, raffle_id: int, **fields: Any) -> None:
+        """Queue changed fields of a raffle for the next flush."""
+        self._pending.setdefault(raffle_id, {}).update(fields)
+
+    def record_state(self, state: Dict[str, Any]) -> None:
+        """Queue an inventory change; watches inventory_hub."""
+        self.record(
+            state["raffle_id"],
+            tickets_sold=state["tickets_sold"],
+            tickets_held=state["tickets_held"],
+            total_tickets=state["total_tickets"],
+            is_open=state["is_active"] and state["winner_id"] is None
+        )
+
+    def record_raffle(self, raffle: Raffle) -> None:
+        """Queue a created or edited raffle, whose end_date changes aren't announced."""
+        self.record(
+            raffle.id,
+            end_date=raffle.end_date,
+            tickets_sold=raffle.tickets_sold or 0,
+            tickets_held=raffle.tickets_held or 0,
+            total_tickets=raffle.total_tickets,
+            is_open=bool(raffle.is_active) and raffle.deleted_at is None and raffle.winner_id is None
+        )
+
+    async def flush(self, now: Optional[datetime] = None) -> int:
+        """
+        Write the queued changes in one pipeline, dropping raffles that
+        have ended from the ranked feeds; returns the number of raffles
+        written.
+        """
+        now = now or datetime.utcnow()
+        pending, self._pending = self._pending, {}
+
+        async def fetch_ended():
+            return await self.client.zrange(self.keys[Feed.ENDING_SOON], "-inf", _timestamp(now), byscore=True)
+
+        try:
+            ended = {int(member) for member in await redis_dependency.call(fetch_ended, idempotent=True)}
+            ended.update(
+                raffle_id for raffle_id, fields in pending.items()
+                if "end_date" in fields and fields["end_date"] <= now
+            )
+            if not pending and not ended:
+                return 0
+            pipe = self.client.pipeline(transaction=False)
+            for raffle_id, fields in pending.items():
+                if not fields.get("is_open", True):
+                    for key in self.keys.values():
+                        pipe.zrem(key, raffle_id)
+                    continue
+                if "end_date" in fields:
+                    pipe.zadd(self.keys[Feed.ENDING_SOON], {raffle_id: _timestamp(fields["end_date"])})
+                if "tickets_sold" in fields and raffle_id not in ended:
+                    pipe.zadd(self.keys[Feed.POPULAR], {raffle_id: fields["tickets_sold"]})
+                    share_left = _share_left(fields["tickets_sold"], fields["tickets_held"], fields["total_tickets"])
+                    pipe.zadd(self.keys[Feed.NEARLY_SOLD_OUT], {raffle_id: share_left})
+            if ended:
+                for feed in RANKED_FEEDS:
+                    pipe.zrem(self.keys[feed], *ended)
+            await redis_dependency.call(pipe.execute)
+        except Exception:
+            # Retried with the next flush, under any newer changes
+            for raffle_id, fields in pending.items():
+                self._pending[raffle_id] = {**fields, **self._pending.get(raffle_id, {})}
+            raise
+        metrics.increment("feeds.raffles_written", len(pending))
+        return len(pending)
+
+    async def rebuild(self, engine: AsyncEngine) -> Optional[int]:
+        """
+        Rewrite every feed from the open raffles. Readers switch to the new
+        feeds at once, never seeing them half written. Returns the number of
+        raffles, or None when another worker holds the rebuild lock.
+        """
+        now = datetime.utcnow()
+        async with engine.begin() as conn:
+            if conn.dialect.name == "postgresql" and not await conn.scalar(
+                text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": FEEDS_LOCK_ID}
+            ):
+                return None
+            result = await conn.execute(
+                select(Raffle.id, Raffle.end_date, Raffle.tickets_sold, Raffle.tickets_held, Raffle.total_tickets)
+                .where(Raffle.is_active, Raffle.deleted_at.is_(None), Raffle.winner_id.is_(None))
+            )
+            raffles = result.all()
+
+        running = [raffle for raffle in raffles if raffle.end_date > now]
+        scores = {
+            Feed.ENDING_SOON: {raffle.id: _timestamp(raffle.end_date) for raffle in raffles},
+            Feed.POPULAR: {raffle.id: raffle.tickets_sold or 0 for raffle in running},
+            Feed.NEARLY_SOLD_OUT: {
+                raffle.id: _share_left(raffle.tickets_sold, raffle.tickets_held, raffle.total_tickets)
+                for raffle in running
+            },
+        }
+        pipe = self.client.pipeline(transaction=True)
+        for feed, key in self.keys.items():
+            staging = f"{key}:rebuild"
+            pipe.delete(staging)
+            members = list(scores[feed].items())
+            for start in range(0, len(members), REBUILD_CHUNK_SIZE):
+                pipe.zadd(staging, dict(members[start:start + REBUILD_CHUNK_SIZE]))
+            if members:
+                pipe.rename(staging, key)
+            else:
+                pipe.delete(key)
+        pipe.set(self.built_key, int(time.time()))
+        # Unguarded: no request waits on it, and it may outlast REDIS_TIMEOUT
+        await pipe.execute()
+        metrics.increment("feeds.rebuilds")
+        return len(raffles)
+
+    async def read(self, feed: Feed, skip: int, limit: int, now: datetime) -> Optional[List[int]]:
+        """Raffle ids of one page of feed, best first; None until the feeds are built."""
+        key = self.keys[feed]
+
+        async def fetch():
+            # A pipeline empties once run, so each attempt builds its own
+            pipe = self.client.pipeline(transaction=False)
+            pipe.exists(self.built_key)
+            if feed == Feed.ENDING_SOON:
+                # Raffles that ended stay open until drawn; they are left out here
+                pipe.zrange(key, f"({_timestamp(now)}", "+inf", byscore=True, offset=skip, num=limit)
+            elif feed == Feed.POPULAR:
+                pipe.zrange(key, skip, skip + limit - 1, desc=True)
+            else:
+                # Sold-out raffles and ones with no tickets sold or held are left out
+                pipe.zrange(key, "(0", "(1", byscore=True, offset=skip, num=limit)
+            return await pipe.execute()
+
+        built, members = await redis_dependency.call(fetch, idempotent=True)
+        return [int(member) for member in members] if built else None
+
+    async def load(self, db: AsyncSession, feed: Feed, skip: int, limit: int) -> List[Raffle]:
+        """
+        One page of feed's raffles, best first. When Redis is unavailable,
+        or the feeds aren't built yet, the page is sorted from raffle
+        instead.
+        """
+        now = datetime.utcnow()
+        try:
+            raffle_ids = await self.read(feed, skip, limit, now)
+        except (DependencyUnavailableError, RedisError):
+            raffle_ids = None
+        open_raffles = [Raffle.is_active, Raffle.deleted_at.is_(None), Raffle.end_date > now]
+        if raffle_ids is None:
+            metrics.increment("feeds.fallbacks")
+            return list(await db.scalars(
+                select(Raffle).where(*open_raffles, *_fallback_filter(feed))
+                .order_by(*_fallback_order(feed), Raffle.id)
+                .offset(skip)
+                .limit(limit)
+            ))
+        if not raffle_ids:
+            return []
+        # Raffles closed since their last flush are dropped
+        raffles = await db.scalars(select(Raffle).where(Raffle.id.in_(raffle_ids), *open_raffles))
+        by_id = {raffle.id: raffle for raffle in raffles}
+        return [by_id[raffle_id] for raffle_id in raffle_ids if raffle_id in by_id]
+
+    async def maintain(self, engine: AsyncEngine) -> None:
+        """
+        Flush recorded changes every FEED_FLUSH_INTERVAL seconds and rebuild
+        the feeds when due or missing; run as a background task.
+        """
+        rebuild_due = 0.0
+
+        async def built():
+            # A coroutine function, so the guard awaits it rather than running it on a thread
+            return await self.client.exists(self.built_key)
+
+        while True:
+            try:
+                if time.monotonic() >= rebuild_due or not await redis_dependency.call(built, idempotent=True):
+                    rebuild_due = time.monotonic() + settings.FEED_REBUILD_INTERVAL
+                    await self.rebuild(engine)
+                await self.flush()
+            except Exception:
+                metrics.increment("feeds.failures")
+            await asyncio.sleep(settings.FEED_FLUSH_INTERVAL)
+
+def _fallback_filter(feed: Feed) -> Sequence[Any]:
+    if feed == Feed.NEARLY_SOLD_OUT:
+        # The same raffles as the (0, 1) share-left range read from Redis
+        return [
+            Raffle.tickets_sold + Raffle.tickets_held > 0,
+            Raffle.tickets_sold + Raffle.tickets_held < Raffle.total_tickets,
+        ]
+    return []
+
+def _fallback_order(feed: Feed) -> Sequence[Any]:
+    if feed == Feed.ENDING_SOON:
+        return [Raffle.end_date]
+    if feed == Feed.POPULAR:
+        return [Raffle.tickets_sold.desc()]
+    return [cast(Raffle.total_tickets - Raffle.tickets_sold - Raffle.tickets_held, Float) / Raffle.total_tickets]
+
+raffle_feeds = RaffleFeeds(redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT))
+# Ticket counts and closes reach the feeds through the inventory listener
+inventory_hub.watch(raffle_feeds.record_state)
@@ -0,0 +1,185 @@
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, case, delete, insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.domain.raffle import Raffle
+from app.models.domain.ticket_hold import TicketHold
+
+NOT_ENOUGH_TICKETS = "Not enough tickets available"
+
+def _per_raffle(quantities: Dict[int, int]):
+    """quantities[raffle.id] as a SQL expression, for updating many raffles in one statement."""
+    return case(quantities, value=Raffle.id, else_=0) if quantities else literal(0)
+
+async def load_checkout_raffles(db: AsyncSession, quantities: Dict[int, int]) -> Dict[int, Raffle]:
+    """
+    The raffles being checked out, by id, read in one query.
+    Raises 404 when any is missing and 400 when any is inactive.
+    """
+    result = await db.scalars(select(Raffle).where(Raffle.id.in_(list(quantities))))
+    raffles = {raffle.id: raffle for raffle in result if not raffle.deleted_at}
+    if len(raffles) < len(quantities):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Raffle not found"
+        )
+    for raffle in raffles.values():
+        if not raffle.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Raffle is not active"
+            )
+    return raffles
+
+def has_tickets_left(raffle: Raffle, quantity: int) -> bool:
+    """Whether quantity more tickets could be held, as of when raffle was read."""
+    return (raffle.tickets_sold or 0) + raffle.tickets_held + quantity <= raffle.total_tickets
+
+async def reserve_tickets(
+    db: AsyncSession,
+    user_id: Any,
+    quantities: Dict[int, int],
+    payment_intent_id: str
+) -> datetime:
+    """
+    Hold quantities[raffle_id] tickets of each raffle for payment_intent_id
+    for HOLD_TTL_SECONDS, in the caller's transaction, and return when the
+    holds expire.
+    One conditional update claims the tickets of every raffle, so
+    concurrent holds can never reserve more than are left; raises 400 when
+    any raffle has too few, and the caller's rollback undoes the rest.
+    """
+    quantity = _per_raffle(quantities)
+    claimed = await db.scalars(
+        update(Raffle)
+        .where(
+            Raffle.id.in_(list(quantities)),
+            Raffle.is_active,
+            Raffle.tickets_sold + Raffle.tickets_held + quantity <= Raffle.total_tickets
+        )
+        .values(tickets_held=Raffle.tickets_held + quantity)
+        .returning(Raffle.id)
+        .execution_options(synchronize_session=False)
+    )
+    if len(claimed.all()) < len(quantities):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=NOT_ENOUGH_TICKETS
+        )
+    expires_at = datetime.utcnow() + timedelta(seconds=settings.HOLD_TTL_SECONDS)
+    await db.execute(
+        insert(TicketHold),
+        [
+            {
+                "raffle_id": raffle_id,
+                "user_id": user_id,
+                "quantity": quantity,
+                "payment_intent_id": payment_intent_id,
+                "expires_at": expires_at,
+            }
+            for raffle_id, quantity in quantities.items()
+        ]
+    )
+    metrics.increment("holds.reserved", len(quantities))
+    return expires_at
+
+async def sell_tickets(
+    db: AsyncSession,
+    user_id: Any,
+    quantities: Dict[int, int],
+    payment_intent_id: str
+) -> None:
+    """
+    Sell quantities[raffle_id] tickets of each raffle, in the caller's
+    transaction.
+    The user's holds for payment_intent_id, where still there, become sold
+    tickets; a raffle without one (it expired and was released) sells only
+    if enough tickets are still free. Raises 400 otherwise.
+    """
+    result = await db.execute(
+        delete(TicketHold)
+        .where(
+            TicketHold.payment_intent_id == payment_intent_id,
+            TicketHold.user_id == user_id,
+            TicketHold.raffle_id.in_(list(quantities))
+        )
+        .returning(TicketHold.raffle_id, TicketHold.quantity)
+    )
+    held = _per_raffle(dict(result.all()))
+    quantity = _per_raffle(quantities)
+    sold = await db.scalars(
+        update(Raffle)
+        .where(
+            Raffle.id.in_(list(quantities)),
+            # A raffle closed by its draw meanwhile sells nothing more
+            Raffle.is_active,
+            Raffle.tickets_sold + Raffle.tickets_held - held + quantity <= Raffle.total_tickets
+        )
+        .values(
+            tickets_held=Raffle.tickets_held - held,
+            tickets_sold=Raffle.tickets_sold + quantity
+        )
+        .returning(Raffle.id)
+        .execution_options(synchronize_session=False)
+    )
+    if len(sold.all()) < len(quantities):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=NOT_ENOUGH_TICKETS
+        )
+    metrics.increment("holds.sold", len(quantities))
+
+async def release_expired_holds(db: AsyncSession, now: Optional[datetime] = None) -> int:
+    """
+    Release up to HOLD_SWEEP_BATCH_SIZE holds that expired before now,
+    oldest first, and commit. Returns the number released.
+    Expired holds are found through the expires_at index, and rows another
+    worker is releasing (or converting) are skipped rather than waited on.
+    """
+    expired = (
+        select(TicketHold.id)
+        .where(TicketHold.expires_at < (now or datetime.utcnow()))
+        .order_by(TicketHold.expires_at)
+        .limit(settings.HOLD_SWEEP_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        delete(TicketHold)
+        .where(TicketHold.id.in_(expired.scalar_subquery()))
+        .returning(TicketHold.raffle_id, TicketHold.quantity)
+    )
+    holds = result.all()
+    released = Counter()
+    for raffle_id, quantity in holds:
+        released[raffle_id] += quantity
+    if released:
+        # One update per raffle, however many of its holds expired
+        raffle = Raffle.__table__
+        await db.execute(
+            update(raffle)
+            .where(raffle.c.id == bindparam("raffle_id"))
+            .values(tickets_held=raffle.c.tickets_held - bindparam("quantity")),
+            [{"raffle_id": raffle_id, "quantity": quantity} for raffle_id, quantity in released.items()]
+        )
+    await db.commit()
+    metrics.increment("holds.released", len(holds))
+    return len(holds)
+
+async def sweep_expired_holds(sessions: async_sessionmaker) -> None:
+    """
+    Release expired holds every HOLD_SWEEP_INTERVAL seconds, a batch at a
+    time until none are left; run as a background task.
+    """
+    while True:
+        try:
+            async with sessions() as db:
+                while await release_expired_holds(db) == settings.HOLD_SWEEP_BATCH_SIZE:
+                    pass
+        except Exception:
+            metrics.increment("holds.sweep_failures")
+        await asyncio.sleep(settings.HOLD_SWEEP_INTERVAL)
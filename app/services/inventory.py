@@ -0,0 +1,167 @@
+import asyncio
+import json
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.domain.raffle import INVENTORY_CHANNEL, Raffle
+
+def inventory_state(
+    raffle_id: int,
+    tickets_sold: Optional[int],
+    tickets_held: int,
+    total_tickets: int,
+    is_active: bool,
+    winner_id: Optional[int]
+) -> Dict[str, Any]:
+    """The inventory message pushed to clients."""
+    tickets_sold = tickets_sold or 0
+    return {
+        "raffle_id": raffle_id,
+        "tickets_sold": tickets_sold,
+        "tickets_held": tickets_held,
+        "total_tickets": total_tickets,
+        # Held tickets are sold to their holder or released when the hold expires
+        "tickets_remaining": max(total_tickets - tickets_sold - tickets_held, 0),
+        "is_active": is_active,
+        "winner_id": winner_id,
+    }
+
+class Subscription:
+    """
+    One client's view of a raffle's inventory.
+    Holds only the latest state, so a slow client skips stale updates
+    instead of queueing them.
+    """
+    def __init__(self) -> None:
+        self._state: Optional[Dict[str, Any]] = None
+        self._ready = asyncio.Event()
+
+    def push(self, state: Dict[str, Any]) -> None:
+        self._state = state
+        self._ready.set()
+
+    async def next(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """The next state, or None if nothing changed within timeout."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._ready.clear()
+        return self._state
+
+class InventoryHub:
+    """
+    Per-worker fan-out of raffle inventory changes.
+    A single LISTEN connection receives every change; changes are coalesced
+    per raffle and pushed to that raffle's subscribers at most
+    max_updates_per_second times a second, however many clients listen.
+    """
+    def __init__(self, max_updates_per_second: float) -> None:
+        self.interval = 1 / max_updates_per_second
+        self._subscribers: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._latest: Dict[int, Dict[str, Any]] = {}
+        self._changed: Dict[int, Dict[str, Any]] = {}
+        self._wakeup = asyncio.Event()
+        self._watchers: List[Callable[[Dict[str, Any]], None]] = []
+
+    def latest(self, raffle_id: int) -> Optional[Dict[str, Any]]:
+        """Last state seen for a raffle that has subscribers, if any."""
+        return self._latest.get(raffle_id)
+
+    def watch(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Call callback with every change this worker hears of, subscribed to or not."""
+        self._watchers.append(callback)
+
+    def publish(self, state: Dict[str, Any]) -> None:
+        raffle_id = state["raffle_id"]
+        metrics.increment("inventory.changes")
+        for callback in self._watchers:
+            callback(state)
+        if raffle_id in self._subscribers:
+            self._latest[raffle_id] = state
+            self._changed[raffle_id] = state
+            self._wakeup.set()
+
+    @asynccontextmanager
+    async def subscribe(self, raffle_id: int, state: Dict[str, Any]) -> AsyncIterator[Subscription]:
+        """Subscribe to a raffle, starting from its current state."""
+        subscription = Subscription()
+        self._latest.setdefault(raffle_id, state)
+        subscription.push(self._latest[raffle_id])
+        self._subscribers[raffle_id].add(subscription)
+        metrics.increment("inventory.subscribers")
+        try:
+            yield subscription
+        finally:
+            metrics.increment("inventory.subscribers", -1)
+            self._subscribers[raffle_id].discard(subscription)
+            if not self._subscribers[raffle_id]:
+                del self._subscribers[raffle_id]
+                self._latest.pop(raffle_id, None)
+
+    def _on_notification(self, connection, pid, channel, payload: str) -> None:
+        self.publish(inventory_state(**json.loads(payload)))
+
+    async def _fan_out(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            changed, self._changed = self._changed, {}
+            for raffle_id, state in changed.items():
+                for subscription in self._subscribers.get(raffle_id, ()):
+                    subscription.push(state)
+                    metrics.increment("inventory.pushes")
+            # Changes arriving meanwhile are merged into the next push
+            await asyncio.sleep(self.interval)
+
+    async def _listen(self, engine: AsyncEngine) -> None:
+        async with engine.connect() as conn:
+            listener = (await conn.get_raw_connection()).driver_connection
+            closed = asyncio.Event()
+            listener.add_termination_listener(lambda connection: closed.set())
+            await listener.add_listener(INVENTORY_CHANNEL, self._on_notification)
+            try:
+                # Changes made while no listener was connected were missed
+                result = await conn.execute(
+                    select(
+                        Raffle.id,
+                        Raffle.tickets_sold,
+                        Raffle.tickets_held,
+                        Raffle.total_tickets,
+                        Raffle.is_active,
+                        Raffle.winner_id
+                    )
+                    .where(Raffle.id.in_(list(self._subscribers)))
+                )
+                for row in result:
+                    self.publish(inventory_state(*row))
+                await conn.commit()
+                await closed.wait()
+            finally:
+                if not listener.is_closed():
+                    await listener.remove_listener(INVENTORY_CHANNEL, self._on_notification)
+
+    async def run(self, engine: AsyncEngine) -> None:
+        """
+        Listen for changes and fan them out; run as a background task.
+        The listener holds one of the engine's connections for as long as
+        it runs, reconnecting if it drops.
+        """
+        fan_out = asyncio.create_task(self._fan_out())
+        try:
+            while True:
+                try:
+                    await self._listen(engine)
+                except Exception:
+                    metrics.increment("inventory.listener_failures")
+                await asyncio.sleep(settings.INVENTORY_RECONNECT_DELAY)
+        finally:
+            fan_out.cancel()
+
+inventory_hub = InventoryHub(settings.INVENTORY_MAX_UPDATES_PER_SECOND)
@@ -1,15 +1,40 @@
+from app.core.config import settings
+from app.core.resilience import Dependency, DependencyUnavailableError
+
+# Guard for Novu calls; see app.core.resilience
+novu_dependency = Dependency(
+    "novu",
+    timeout=settings.NOVU_TIMEOUT,
+    max_concurrency=settings.NOVU_MAX_CONCURRENCY,
+    failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=settings.CIRCUIT_RESET_TIMEOUT,
+)
+
 # Temporarily disabled Novu notifications
 class NotificationService:
-    async def trigger_event(self, *args, **kwargs):
+    async def _send(self, *args, **kwargs):
         pass
 
+    async def _deliver(self, *args, **kwargs):
+        """
+        Notifications are best effort: when Novu is slow or tripped open
+        the caller carries on instead of failing the request.
+        """
+        try:
+            await novu_dependency.call(self._send, *args, **kwargs)
+        except DependencyUnavailableError:
+            pass
+
+    async def trigger_event(self, *args, **kwargs):
+        await self._deliver(*args, **kwargs)
+
     async def register_subscriber(self, *args, **kwargs):
-        pass
+        await self._deliver(*args, **kwargs)
 
     async def update_subscriber_preferences(self, *args, **kwargs):
-        pass
+        await self._deliver(*args, **kwargs)
 
     async def delete_subscriber(self, *args, **kwargs):
-        pass
+        await self._deliver(*args, **kwargs)
 
 notification_service = NotificationService()
@@ -1,16 +1,40 @@
 from typing import Dict, Any, Optional
+import uuid
 import stripe
 from fastapi import HTTPException, status
 
 from app.core.config import settings
+from app.core.resilience import Dependency
 
 # Initialize Stripe with API key
 stripe.api_key = settings.STRIPE_API_KEY
+stripe.api_base = settings.STRIPE_API_BASE
+
+# Guard for every Stripe API call; see app.core.resilience.
+# Writes carry an idempotency key so that retrying them is safe.
+stripe_dependency = Dependency(
+    "stripe",
+    timeout=settings.STRIPE_TIMEOUT,
+    max_concurrency=settings.STRIPE_MAX_CONCURRENCY,
+    failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=settings.CIRCUIT_RESET_TIMEOUT,
+    retries=settings.RETRY_ATTEMPTS,
+    backoff=settings.RETRY_BACKOFF,
+    failure_exceptions=(
+        stripe.error.APIConnectionError,
+        stripe.error.APIError,
+        stripe.error.RateLimitError,
+    ),
+)
+
+def items_metadata(quantities: Dict[int, int]) -> str:
+    """A batch's items as intent metadata, "<raffle id>:<quantity>,..." by raffle id."""
+    return ",".join(f"{raffle_id}:{quantity}" for raffle_id, quantity in sorted(quantities.items()))
 
 class PaymentService:
     @staticmethod
     async def create_payment_intent(
-        amount: float,
+        amount_cents: int,
         currency: str = "usd",
         metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
@@ -18,7 +42,7 @@ class PaymentService:
         Create a payment intent for a purchase.
         
         Args:
-            amount: Amount in dollars (will be converted to cents)
+            amount_cents: Amount in cents
             currency: Currency code (default: usd)
             metadata: Additional metadata for the payment
         
@@ -26,16 +50,16 @@ class PaymentService:
             Payment intent details including client secret
         """
         try:
-            # Convert amount to cents
-            amount_cents = int(amount * 100)
-            
-            intent = stripe.PaymentIntent.create(
+            intent = await stripe_dependency.call(
+                stripe.PaymentIntent.create,
                 amount=amount_cents,
                 currency=currency,
                 metadata=metadata or {},
                 automatic_payment_methods={
                     "enabled": True
-                }
+                },
+                idempotency_key=str(uuid.uuid4()),
+                idempotent=True
             )
             
             return {
@@ -49,7 +73,7 @@ class PaymentService:
             )
 
     @staticmethod
-    async def confirm_payment(payment_intent_id: str) -> bool:
+    async def confirm_payment(payment_intent_id: str) -> Optional[Any]:
         """
         Confirm that a payment was successful.
         
@@ -57,28 +81,54 @@ class PaymentService:
             payment_intent_id: The ID of the payment intent to check
             
         Returns:
-            True if payment was successful, False otherwise
+            The payment intent if payment was successful, None otherwise
         """
         try:
-            intent = stripe.PaymentIntent.retrieve(payment_intent_id)
-            return intent.status == "succeeded"
+            intent = await stripe_dependency.call(
+                stripe.PaymentIntent.retrieve, payment_intent_id, idempotent=True
+            )
+            return intent if intent.status == "succeeded" else None
         except stripe.error.StripeError as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=str(e)
             )
 
+    @staticmethod
+    def check_payment(intent: Any, amount_cents: int, user_id: Any, **metadata: Any) -> None:
+        """
+        Make sure a paid intent covers what is being bought: amount_cents in
+        STRIPE_CURRENCY, by user_id, for the metadata (raffle_id and
+        quantity, or items) it was created with. Raises 400 otherwise.
+        """
+        expected = {"user_id": user_id, **metadata}
+        # Stripe hands metadata back as strings, in an object that isn't a
+        # dict in recent SDKs, so only `in` and [] are used on it
+        intent_metadata = intent.metadata or {}
+        if (
+            intent.amount != amount_cents
+            or intent.currency.lower() != settings.STRIPE_CURRENCY.lower()
+            or any(
+                key not in intent_metadata or intent_metadata[key] != str(value)
+                for key, value in expected.items()
+            )
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Payment does not match the purchase"
+            )
+
     @staticmethod
     async def refund_payment(
         payment_intent_id: str,
-        amount: Optional[float] = None
+        amount_cents: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Refund a payment.
         
         Args:
             payment_intent_id: The ID of the payment to refund
-            amount: Optional amount to refund (in dollars). If not provided, full amount is refunded.
+            amount_cents: Optional amount to refund (in cents). If not provided, full amount is refunded.
             
         Returns:
             Refund details
@@ -86,14 +136,19 @@ class PaymentService:
         try:
             refund_params = {"payment_intent": payment_intent_id}
             
-            if amount:
-                refund_params["amount"] = int(amount * 100)
+            if amount_cents:
+                refund_params["amount"] = amount_cents
             
-            refund = stripe.Refund.create(**refund_params)
+            refund = await stripe_dependency.call(
+                stripe.Refund.create,
+                **refund_params,
+                idempotency_key=str(uuid.uuid4()),
+                idempotent=True
+            )
             return {
                 "refund_id": refund.id,
                 "status": refund.status,
-                "amount": refund.amount / 100  # Convert cents to dollars
+                "amount_cents": refund.amount
             }
         except stripe.error.StripeError as e:
             raise HTTPException(
@@ -130,8 +185,8 @@ class PaymentService:
                 return {
                     "status": "success",
                     "payment_intent_id": payment_intent.id,
-                    "amount": payment_intent.amount / 100,
-                    "metadata": payment_intent.metadata
+                    "amount_cents": payment_intent.amount,
+                    "metadata": payment_intent.metadata.to_dict()
                 }
             
             elif event.type == "payment_intent.payment_failed":
@@ -140,7 +195,10 @@ class PaymentService:
                 return {
                     "status": "failed",
                     "payment_intent_id": payment_intent.id,
-                    "error": payment_intent.last_payment_error
+                    "error": (
+                        payment_intent.last_payment_error.to_dict()
+                        if payment_intent.last_payment_error else None
+                    )
                 }
             
             # Return raw event data for other event types
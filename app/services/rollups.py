@@ -0,0 +1,104 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import distinct, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.domain.analytics import RaffleHourlyStats, RaffleStats
+from app.models.domain.purchase import Purchase
+
+# Lets one worker refresh at a time (arbitrary, app-wide)
+ROLLUP_LOCK_ID = 0x726f6c6c
+
+# Purchases are committed a moment after their purchase_date is set, so the
+# hour before the newest rolled-up one is recounted too
+LATE_PURCHASE_WINDOW = timedelta(hours=1)
+
+async def refresh_rollups(conn: AsyncConnection, since: Optional[datetime] = None) -> Optional[int]:
+    """
+    Recount the hourly and lifetime rollups of every raffle with purchases
+    from since on (default: the last rolled-up hour, less
+    LATE_PURCHASE_WINDOW; everything on the first run). Rows are upserted,
+    so refreshing a period twice is harmless.
+    Runs inside the caller's transaction and returns the number of hourly
+    rows written, or None when another worker holds the refresh lock or
+    the database isn't Postgres.
+    """
+    if conn.dialect.name != "postgresql":
+        return None
+    if not await conn.scalar(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": ROLLUP_LOCK_ID}):
+        return None
+    if since is None:
+        last_hour = await conn.scalar(select(func.max(RaffleHourlyStats.hour)))
+        since = last_hour - LATE_PURCHASE_WINDOW if last_hour else datetime.min
+    # Whole hours only, so every hour written is counted in full
+    since = since.replace(minute=0, second=0, microsecond=0)
+
+    hour = func.date_trunc("hour", Purchase.purchase_date)
+    hourly = (
+        select(
+            Purchase.raffle_id,
+            hour,
+            func.count(),
+            func.sum(Purchase.quantity),
+            func.sum(Purchase.total_amount_cents),
+            func.count(distinct(Purchase.user_id)),
+        )
+        .where(Purchase.purchase_date >= since)
+        .group_by(Purchase.raffle_id, hour)
+    )
+    upsert = insert(RaffleHourlyStats).from_select(
+        ["raffle_id", "hour", "purchases", "tickets", "revenue_cents", "buyers"], hourly
+    )
+    result = await conn.execute(upsert.on_conflict_do_update(
+        index_elements=["raffle_id", "hour"],
+        set_={
+            "purchases": upsert.excluded.purchases,
+            "tickets": upsert.excluded.tickets,
+            "revenue_cents": upsert.excluded.revenue_cents,
+            "buyers": upsert.excluded.buyers,
+            "updated_at": func.now(),
+        }
+    ))
+
+    touched = select(Purchase.raffle_id).where(Purchase.purchase_date >= since).distinct()
+    lifetime = (
+        select(
+            Purchase.raffle_id,
+            func.count(),
+            func.sum(Purchase.quantity),
+            func.sum(Purchase.total_amount_cents),
+            func.count(distinct(Purchase.user_id)),
+            func.max(Purchase.purchase_date),
+        )
+        .where(Purchase.raffle_id.in_(touched))
+        .group_by(Purchase.raffle_id)
+    )
+    upsert = insert(RaffleStats).from_select(
+        ["raffle_id", "purchases", "tickets", "revenue_cents", "buyers", "last_purchase_at"], lifetime
+    )
+    await conn.execute(upsert.on_conflict_do_update(
+        index_elements=["raffle_id"],
+        set_={
+            "purchases": upsert.excluded.purchases,
+            "tickets": upsert.excluded.tickets,
+            "revenue_cents": upsert.excluded.revenue_cents,
+            "buyers": upsert.excluded.buyers,
+            "last_purchase_at": upsert.excluded.last_purchase_at,
+            "updated_at": func.now(),
+        }
+    ))
+    metrics.increment("rollups.refreshes")
+    return result.rowcount
+
+async def maintain_rollups(engine) -> None:
+    """Refresh the rollups every ROLLUP_REFRESH_INTERVAL; run as a background task."""
+    while True:
+        try:
+            async with engine.begin() as conn:
+                await refresh_rollups(conn)
+        except Exception:
+            metrics.increment("rollups.failures")
+        await asyncio.sleep(settings.ROLLUP_REFRESH_INTERVAL)
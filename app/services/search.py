@@ -0,0 +1,90 @@
+import base64
+import json
+from datetime import datetime, timedelta
+from typing import Any, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import REAL, func, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import websearch_to_tsquery
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.domain.raffle import SEARCH_CONFIG, SEARCH_VECTOR, Raffle
+
+def encode_cursor(key: Sequence[Any]) -> str:
+    """Opaque cursor for the page after key, the last result's sort key."""
+    value = [item.isoformat() if isinstance(item, datetime) else item for item in key]
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+def decode_cursor(cursor: str, ranked: bool) -> Tuple[Any, int]:
+    """The sort key a cursor continues after; raises 400 when it isn't one."""
+    try:
+        first, raffle_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        first = float(first) if ranked else datetime.fromisoformat(first)
+        return first, int(raffle_id)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+async def search_raffles(
+    db: AsyncSession,
+    q: Optional[str] = None,
+    min_price_cents: Optional[int] = None,
+    max_price_cents: Optional[int] = None,
+    ending_within_hours: Optional[float] = None,
+    cursor: Optional[str] = None,
+    limit: int = 20
+) -> Tuple[List[Tuple[Raffle, Optional[float]]], Optional[str]]:
+    """
+    A page of open raffles matching q and the filters, with each one's
+    relevance rank and the cursor of the next page (None on the last).
+    With q, the best matches come first. Otherwise the raffles ending
+    soonest come first.
+    On Postgres, q is matched against the search_vector GIN index in
+    websearch syntax (quoted phrases, "or", -word). Pages continue after
+    the last result's sort key rather than an offset, so deep pages cost
+    no more than the first. Other databases match every word of q against
+    title and description with LIKE and don't rank.
+    """
+    limit = max(1, min(limit, settings.SEARCH_MAX_LIMIT))
+    now = datetime.utcnow()
+    query = select(Raffle).where(
+        Raffle.is_active,
+        Raffle.deleted_at.is_(None),
+        Raffle.end_date > now
+    )
+    if min_price_cents is not None:
+        query = query.where(Raffle.ticket_price_cents >= min_price_cents)
+    if max_price_cents is not None:
+        query = query.where(Raffle.ticket_price_cents <= max_price_cents)
+    if ending_within_hours is not None:
+        query = query.where(Raffle.end_date <= now + timedelta(hours=ending_within_hours))
+
+    ranked = bool(q) and db.bind.dialect.name == "postgresql"
+    if ranked:
+        tsquery = websearch_to_tsquery(SEARCH_CONFIG, q)
+        rank = func.ts_rank(SEARCH_VECTOR, tsquery, type_=REAL)
+        query = (
+            query.add_columns(rank)
+            .where(SEARCH_VECTOR.bool_op("@@")(tsquery))
+            .order_by(rank.desc(), Raffle.id.desc())
+        )
+        if cursor:
+            query = query.where(tuple_(rank, Raffle.id) < decode_cursor(cursor, ranked))
+    else:
+        for word in (q or "").split():
+            pattern = f"%{word}%"
+            query = query.where(or_(Raffle.title.ilike(pattern), Raffle.description.ilike(pattern)))
+        query = query.order_by(Raffle.end_date, Raffle.id)
+        if cursor:
+            query = query.where(tuple_(Raffle.end_date, Raffle.id) > decode_cursor(cursor, ranked))
+
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    metrics.increment("search.queries")
+    results = [(row[0], row[1] if ranked else None) for row in rows[:limit]]
+    if len(rows) <= limit:
+        return results, None
+    raffle, rank_value = results[-1]
+    key = (rank_value, raffle.id) if ranked else (raffle.end_date, raffle.id)
+    return results, encode_cursor(key)
@@ -0,0 +1,226 @@
+"""
+Checkout path benchmark.
+
+Drives register -> login -> create-intent -> purchase -> list history
+against the app in-process, with the Supabase and Stripe fakes from
+stubs.py and a scratch database, then reports p50/p95/p99 latency per
+endpoint and overall throughput.
+
+    python scripts/benchmark.py
+    python scripts/benchmark.py --save-baseline scripts/benchmark_baseline.json
+    python scripts/benchmark.py --baseline scripts/benchmark_baseline.json
+
+With --baseline, the run fails when any endpoint's p95 is more than
+--tolerance slower than the baseline. Use --database-url to benchmark
+against a scratch Postgres database; it is dropped and re-created.
+
+With --base-url the benchmark drives a running server over HTTP instead.
+Start scripts/fake_services.py and run the server with SUPABASE_URL,
+STRIPE_API_BASE, LOCAL_DATABASE=true and DATABASE_URI pointing at the fakes
+and at the same --database-url; both fakes are reset before the run.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from stubs import (
+    FakeStripe,
+    FakeSupabase,
+    create_scratch_database,
+    use_database,
+    use_fake_services,
+)
+
+import httpx
+
+from app.main import app
+from app.core.config import settings
+from app.models.domain.raffle import Raffle
+from app.models.domain.user import User
+
+TICKET_PRICE_CENTS = 2500
+ENDPOINTS = ["register", "login", "create_intent", "purchase", "list_history"]
+
+
+class Recorder:
+    """Latencies in milliseconds and error counts per endpoint."""
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def call(self, name: str, request) -> httpx.Response:
+        start = time.perf_counter()
+        response = await request
+        self.latencies[name].append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 400:
+            self.errors[name] += 1
+        return response
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        summary = {}
+        for name in ENDPOINTS:
+            samples = self.latencies.get(name)
+            if not samples:
+                continue
+            # quantiles needs two samples; a single one is every percentile
+            cuts = statistics.quantiles(samples, n=100) if len(samples) > 1 else samples * 99
+            summary[name] = {
+                "count": len(samples),
+                "errors": self.errors.get(name, 0),
+                "p50": round(cuts[49], 3),
+                "p95": round(cuts[94], 3),
+                "p99": round(cuts[98], 3),
+            }
+        return summary
+
+
+async def seed(sessions, users: int) -> None:
+    async with sessions() as session:
+        session.add_all([
+            User(email=f"user{i}@luxewin.com", hashed_password="-", wallet_address=f"0x{i:040x}")
+            for i in range(1, users + 1)
+        ])
+        session.add(Raffle(
+            title="Benchmark Watch",
+            ticket_price_cents=TICKET_PRICE_CENTS,
+            total_tickets=10_000_000,
+            tickets_sold=0,
+            end_date=datetime.utcnow() + timedelta(days=30),
+            is_active=True,
+        ))
+        await session.commit()
+
+
+async def virtual_user(client: httpx.AsyncClient, recorder: Recorder, index: int, iterations: int) -> None:
+    api = settings.API_V1_STR
+    email = f"user{index}@luxewin.com"
+    await recorder.call("register", client.post(
+        f"{api}/auth/register",
+        json={"email": email, "password": "secret", "full_name": f"User {index}"},
+    ))
+    response = await recorder.call("login", client.post(
+        f"{api}/auth/login", data={"username": email, "password": "secret"},
+    ))
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    for _ in range(iterations):
+        response = await recorder.call("create_intent", client.post(
+            f"{api}/payments/create-intent",
+            json={"raffle_id": 1, "quantity": 1},
+            headers=headers,
+        ))
+        intent = response.json()
+        await recorder.call("purchase", client.post(
+            f"{api}/purchases/",
+            json={
+                "raffle_id": 1,
+                "quantity": 1,
+                "total_amount_cents": TICKET_PRICE_CENTS,
+                "payment_intent_id": intent["payment_intent_id"],
+            },
+            headers=headers,
+        ))
+        await recorder.call("list_history", client.get(f"{api}/purchases/", headers=headers))
+
+
+def compare(summary: Dict, baseline: Dict, tolerance: float) -> bool:
+    ok = True
+    print(f"\n{'endpoint':<14} {'p95 base':>10} {'p95 now':>10} {'change':>8}")
+    for name, stats in summary["endpoints"].items():
+        base = baseline["endpoints"].get(name)
+        if not base:
+            continue
+        change = (stats["p95"] - base["p95"]) / base["p95"] if base["p95"] else 0.0
+        regressed = change > tolerance
+        ok = ok and not regressed
+        print(
+            f"{name:<14} {base['p95']:>10.2f} {stats['p95']:>10.2f} {change:>+7.0%}"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+    return ok
+
+
+async def reset_fake_services() -> None:
+    async with httpx.AsyncClient() as client:
+        for base_url in (settings.SUPABASE_URL, settings.STRIPE_API_BASE):
+            response = await client.post(f"{base_url}/_fake/reset")
+            response.raise_for_status()
+
+
+async def run(args: argparse.Namespace) -> bool:
+    engine, sessions = await create_scratch_database(args.database_url)
+    await seed(sessions, args.users)
+    if args.base_url:
+        await reset_fake_services()
+        client_options = {"base_url": args.base_url, "timeout": 30.0}
+    else:
+        use_database(app, sessions)
+        use_fake_services(FakeSupabase(), FakeStripe())
+        client_options = {"transport": httpx.ASGITransport(app=app), "base_url": "http://benchmark"}
+
+    recorder = Recorder()
+    async with httpx.AsyncClient(**client_options) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            virtual_user(client, recorder, index, args.iterations)
+            for index in range(1, args.users + 1)
+        ))
+        elapsed = time.perf_counter() - start
+    await engine.dispose()
+
+    requests = sum(len(samples) for samples in recorder.latencies.values())
+    summary = {
+        "users": args.users,
+        "iterations": args.iterations,
+        "throughput": {
+            "requests_per_second": round(requests / elapsed, 1),
+            "checkouts_per_second": round(len(recorder.latencies["purchase"]) / elapsed, 1),
+        },
+        "endpoints": recorder.summary(),
+    }
+
+    print(f"{'endpoint':<14} {'count':>6} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, stats in summary["endpoints"].items():
+        print(
+            f"{name:<14} {stats['count']:>6} {stats['errors']:>6} "
+            f"{stats['p50']:>8.2f} {stats['p95']:>8.2f} {stats['p99']:>8.2f}"
+        )
+    print(
+        f"\n{summary['throughput']['requests_per_second']} req/s, "
+        f"{summary['throughput']['checkouts_per_second']} checkouts/s"
+    )
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(summary, f, indent=2)
+            f.write("\n")
+
+    errors = sum(stats["errors"] for stats in summary["endpoints"].values())
+    ok = errors == 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            ok = compare(summary, json.load(f), args.tolerance) and ok
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    # Concurrent sessions need separate connections, which in-memory SQLite can't share
+    parser.add_argument(
+        "--database-url",
+        default=f"sqlite+aiosqlite:///{tempfile.gettempdir()}/luxewin_benchmark.db",
+    )
+    parser.add_argument("--base-url", help="Benchmark a running server instead of the app in-process")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", help="Write this run's results as a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p95 slowdown")
+    sys.exit(0 if asyncio.run(run(parser.parse_args())) else 1)
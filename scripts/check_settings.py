@@ -0,0 +1,64 @@
+"""
+Check that list settings load from the environment in every documented form.
+
+Loads Settings with DATABASE_REPLICA_URIS set comma separated, as README.md
+documents, as a JSON list and empty, and compares the parsed lists. Exits
+non-zero when any form fails to load or parses wrong.
+
+    python scripts/check_settings.py
+"""
+import os
+import sys
+from pathlib import Path
+from typing import List
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Required settings without defaults, for loading Settings here
+REQUIRED = {
+    "SECRET_KEY": "check",
+    "POSTGRES_SERVER": "localhost",
+    "POSTGRES_USER": "postgres",
+    "POSTGRES_PASSWORD": "postgres",
+    "POSTGRES_DB": "luxewin",
+}
+for name, value in REQUIRED.items():
+    os.environ.setdefault(name, value)
+
+from app.core.config import Settings
+
+CASES = [
+    ("sqlite+aiosqlite:///./replica.db", ["sqlite+aiosqlite:///./replica.db"]),
+    (
+        "postgresql+asyncpg://replica-1/luxewin, postgresql+asyncpg://replica-2/luxewin",
+        ["postgresql+asyncpg://replica-1/luxewin", "postgresql+asyncpg://replica-2/luxewin"],
+    ),
+    ('["postgresql+asyncpg://replica-1/luxewin"]', ["postgresql+asyncpg://replica-1/luxewin"]),
+    ("", []),
+]
+
+
+def load_replica_uris(value: str) -> List[str]:
+    os.environ["DATABASE_REPLICA_URIS"] = value
+    try:
+        return Settings(_env_file=None).DATABASE_REPLICA_URIS
+    finally:
+        del os.environ["DATABASE_REPLICA_URIS"]
+
+
+def run() -> bool:
+    ok = True
+    for value, expected in CASES:
+        try:
+            parsed = load_replica_uris(value)
+        except Exception as exc:
+            parsed = f"error: {exc}".splitlines()[0]
+        passed = parsed == expected
+        ok = ok and passed
+        print(f"{'ok' if passed else 'FAIL':>4}  DATABASE_REPLICA_URIS={value!r} -> {parsed}")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run() else 1)
@@ -0,0 +1,342 @@
+"""
+Local stand-ins for the Supabase and Stripe HTTP APIs.
+
+Implements the subset of Supabase Auth/PostgREST and Stripe
+PaymentIntent/Refund/Webhook endpoints the app calls, in memory, with
+configurable injected latency and error rates, so benchmarks and capacity
+tests run fully offline.
+
+    python scripts/fake_services.py --latency-ms 20 --jitter-ms 10 --error-rate 0.01
+
+Point the app at them with:
+
+    SUPABASE_URL=http://127.0.0.1:54321
+    STRIPE_API_BASE=http://127.0.0.1:12111
+    STRIPE_WEBHOOK_SECRET=whsec_fake
+
+Control endpoints (never delayed or failed):
+- POST /_fake/config  {"latency_ms": .., "jitter_ms": .., "error_rate": ..}
+- POST /_fake/reset   drop all stored state
+- POST /_fake/webhooks (Stripe only) {"payment_intent_id": .., "type": .., "url": ..}
+  sends a signed webhook event to url
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import itertools
+import json
+import random
+import secrets
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from jose import jwt
+
+SUPABASE_JWT_SECRET = "fake-supabase-jwt-secret"
+STRIPE_WEBHOOK_SECRET = "whsec_fake"
+
+
+class FaultInjection:
+    """Latency and error injection applied to every non-control request."""
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0) -> None:
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+
+    def update(self, values: Dict[str, float]) -> Dict[str, float]:
+        for name in ("latency_ms", "jitter_ms", "error_rate"):
+            if name in values:
+                setattr(self, name, float(values[name]))
+        return vars(self)
+
+    def install(self, app: FastAPI, error_body: Dict[str, Any]) -> None:
+        @app.middleware("http")
+        async def inject_faults(request: Request, call_next):
+            if request.url.path.startswith("/_fake"):
+                return await call_next(request)
+            delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+            if delay > 0:
+                await asyncio.sleep(delay / 1000)
+            if random.random() < self.error_rate:
+                return JSONResponse(status_code=503, content=error_body)
+            return await call_next(request)
+
+        @app.post("/_fake/config")
+        async def configure(values: Dict[str, float]) -> Dict[str, float]:
+            return self.update(values)
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# Supabase
+
+def create_supabase_app(faults: FaultInjection) -> FastAPI:
+    """
+    Supabase Auth (signup, password grant, user) and PostgREST tables.
+    Auth user ids are issued as "1", "2", ...; numeric ids written to a
+    table are stored as integers to match the local SQL users table.
+    """
+    app = FastAPI(title="Fake Supabase")
+    state: Dict[str, Any] = {}
+
+    def reset() -> None:
+        state["user_ids"] = itertools.count(1)
+        state["accounts"] = {}  # email -> {"password", "user"}
+        state["tables"] = {}  # table -> list of rows
+
+    reset()
+    faults.install(app, {"code": 503, "msg": "Injected failure"})
+
+    def session_for(user: Dict[str, Any]) -> Dict[str, Any]:
+        expires_in = 3600
+        access_token = jwt.encode(
+            {"sub": user["id"], "role": "authenticated", "exp": int(time.time()) + expires_in},
+            SUPABASE_JWT_SECRET,
+        )
+        return {
+            "access_token": access_token,
+            "refresh_token": secrets.token_hex(16),
+            "expires_in": expires_in,
+            "expires_at": int(time.time()) + expires_in,
+            "token_type": "bearer",
+            "user": user,
+        }
+
+    def auth_error(status_code: int, message: str) -> JSONResponse:
+        return JSONResponse(status_code=status_code, content={"code": status_code, "msg": message})
+
+    @app.post("/_fake/reset")
+    async def reset_state() -> Dict[str, str]:
+        reset()
+        return {"status": "reset"}
+
+    @app.post("/auth/v1/signup")
+    async def sign_up(body: Dict[str, Any]):
+        if body["email"] in state["accounts"]:
+            return auth_error(422, "User already registered")
+        user = {
+            "id": str(next(state["user_ids"])),
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": body["email"],
+            "app_metadata": {"provider": "email"},
+            "user_metadata": body.get("data") or {},
+            "created_at": now_iso(),
+        }
+        state["accounts"][body["email"]] = {"password": body["password"], "user": user}
+        return session_for(user)
+
+    @app.post("/auth/v1/token")
+    async def token(body: Dict[str, Any], grant_type: str = "password"):
+        account = state["accounts"].get(body.get("email"))
+        if grant_type != "password" or not account or account["password"] != body.get("password"):
+            return auth_error(400, "Invalid login credentials")
+        return session_for(account["user"])
+
+    @app.get("/auth/v1/user")
+    async def get_user(request: Request):
+        token = request.headers.get("authorization", "").removeprefix("Bearer ")
+        try:
+            claims = jwt.decode(token, SUPABASE_JWT_SECRET)
+        except jwt.JWTError:
+            return auth_error(401, "Invalid token")
+        for account in state["accounts"].values():
+            if account["user"]["id"] == claims["sub"]:
+                return account["user"]
+        return auth_error(404, "User not found")
+
+    def stored(value: Any) -> Any:
+        return int(value) if isinstance(value, str) and value.isdigit() else value
+
+    def matches(row: Dict[str, Any], request: Request) -> bool:
+        for column, condition in request.query_params.items():
+            if column in ("select", "limit", "offset", "order"):
+                continue
+            operator, _, value = condition.partition(".")
+            if operator == "eq" and str(row.get(column)) != value:
+                return False
+        return True
+
+    @app.get("/rest/v1/{table}")
+    async def select_rows(table: str, request: Request) -> List[Dict[str, Any]]:
+        return [row for row in state["tables"].get(table, []) if matches(row, request)]
+
+    @app.post("/rest/v1/{table}", status_code=201)
+    async def insert_rows(table: str, request: Request) -> List[Dict[str, Any]]:
+        body = await request.json()
+        rows = [
+            {column: stored(value) for column, value in row.items()}
+            for row in (body if isinstance(body, list) else [body])
+        ]
+        state["tables"].setdefault(table, []).extend(rows)
+        return rows
+
+    @app.patch("/rest/v1/{table}")
+    async def update_rows(table: str, request: Request) -> List[Dict[str, Any]]:
+        values = await request.json()
+        updated = [row for row in state["tables"].get(table, []) if matches(row, request)]
+        for row in updated:
+            row.update(values)
+        return updated
+
+    return app
+
+
+# Stripe
+
+def create_stripe_app(faults: FaultInjection, webhook_secret: str, intent_status: str) -> FastAPI:
+    """
+    Stripe PaymentIntent, Refund and webhook delivery.
+    New payment intents take intent_status, "succeeded" by default so that
+    purchases confirm without a client-side payment step.
+    """
+    app = FastAPI(title="Fake Stripe")
+    state: Dict[str, Any] = {}
+
+    def reset() -> None:
+        state["ids"] = itertools.count(1)
+        state["intents"] = {}
+        state["refunds"] = {}
+
+    reset()
+    faults.install(app, {"error": {"type": "api_error", "message": "Injected failure"}})
+
+    def not_found(kind: str, object_id: str) -> JSONResponse:
+        return JSONResponse(status_code=404, content={"error": {
+            "type": "invalid_request_error",
+            "code": "resource_missing",
+            "message": f"No such {kind}: '{object_id}'",
+        }})
+
+    async def form_params(request: Request) -> Dict[str, Any]:
+        """Decode Stripe's form encoding, folding metadata[key] into a dict."""
+        params: Dict[str, Any] = {"metadata": {}}
+        for key, value in (await request.form()).multi_items():
+            if key.startswith("metadata["):
+                params["metadata"][key[len("metadata["):-1]] = value
+            else:
+                params[key] = value
+        return params
+
+    @app.post("/_fake/reset")
+    async def reset_state() -> Dict[str, str]:
+        reset()
+        return {"status": "reset"}
+
+    @app.post("/v1/payment_intents")
+    async def create_payment_intent(request: Request) -> Dict[str, Any]:
+        params = await form_params(request)
+        intent_id = f"pi_fake{next(state['ids']):08d}"
+        intent = {
+            "id": intent_id,
+            "object": "payment_intent",
+            "amount": int(params["amount"]),
+            "currency": params.get("currency", "usd"),
+            "client_secret": f"{intent_id}_secret_{secrets.token_hex(8)}",
+            "status": intent_status,
+            "metadata": params["metadata"],
+            "last_payment_error": None,
+            "created": int(time.time()),
+        }
+        state["intents"][intent_id] = intent
+        return intent
+
+    @app.get("/v1/payment_intents/{intent_id}")
+    async def retrieve_payment_intent(intent_id: str):
+        intent = state["intents"].get(intent_id)
+        return intent or not_found("payment_intent", intent_id)
+
+    @app.post("/v1/refunds")
+    async def create_refund(request: Request):
+        params = await form_params(request)
+        intent = state["intents"].get(params.get("payment_intent"))
+        if not intent:
+            return not_found("payment_intent", params.get("payment_intent"))
+        refund_id = f"re_fake{next(state['ids']):08d}"
+        refund = {
+            "id": refund_id,
+            "object": "refund",
+            "amount": int(params.get("amount", intent["amount"])),
+            "currency": intent["currency"],
+            "payment_intent": intent["id"],
+            "status": "succeeded",
+            "created": int(time.time()),
+        }
+        state["refunds"][refund_id] = refund
+        return refund
+
+    @app.post("/_fake/webhooks")
+    async def send_webhook(body: Dict[str, Any]):
+        intent = state["intents"].get(body["payment_intent_id"])
+        if not intent:
+            return not_found("payment_intent", body["payment_intent_id"])
+        event = {
+            "id": f"evt_fake{next(state['ids']):08d}",
+            "object": "event",
+            "type": body.get("type", "payment_intent.succeeded"),
+            "created": int(time.time()),
+            "data": {"object": intent},
+        }
+        payload = json.dumps(event)
+        timestamp = int(time.time())
+        signature = hmac.new(
+            webhook_secret.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256
+        ).hexdigest()
+        async with httpx.AsyncClient() as client:
+            response = await client.post(
+                body["url"],
+                content=payload,
+                headers={
+                    "Content-Type": "application/json",
+                    "Stripe-Signature": f"t={timestamp},v1={signature}",
+                },
+            )
+        return {"event_id": event["id"], "status_code": response.status_code}
+
+    return app
+
+
+async def serve(apps: List[tuple[FastAPI, int]], host: str) -> None:
+    servers = [
+        uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+        for app, port in apps
+    ]
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--supabase-port", type=int, default=54321)
+    parser.add_argument("--stripe-port", type=int, default=12111)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--webhook-secret", default=STRIPE_WEBHOOK_SECRET)
+    parser.add_argument("--intent-status", default="succeeded")
+    args = parser.parse_args(argv)
+
+    def faults() -> FaultInjection:
+        return FaultInjection(args.latency_ms, args.jitter_ms, args.error_rate)
+
+    apps = [
+        (create_supabase_app(faults()), args.supabase_port),
+        (create_stripe_app(faults(), args.webhook_secret, args.intent_status), args.stripe_port),
+    ]
+    print(
+        f"Fake Supabase on http://{args.host}:{args.supabase_port}, "
+        f"fake Stripe on http://{args.host}:{args.stripe_port}"
+    )
+    asyncio.run(serve(apps, args.host))
+
+
+if __name__ == "__main__":
+    main()
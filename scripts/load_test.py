@@ -0,0 +1,109 @@
+"""
+Worker scaling load test.
+
+Starts the production server (app.server) with 1..N workers in turn, drives
+GET /raffles/ with a fixed number of concurrent clients and prints the
+throughput for each worker count, so near-linear scaling can be checked
+locally.
+
+    python scripts/load_test.py --max-workers 4 --duration 15
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+
+ROOT = Path(__file__).parent.parent
+
+
+async def wait_until_ready(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                response = await client.get(f"{base_url}/health")
+                if response.status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not become ready")
+
+
+async def drive(url: str, concurrency: int, duration: float) -> tuple[int, int]:
+    """Hammer url from concurrency clients; return (ok, errors)."""
+    ok = 0
+    errors = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=10.0) as client:
+        async def worker() -> None:
+            nonlocal ok, errors
+            while time.monotonic() < deadline:
+                try:
+                    response = await client.get(url)
+                    if response.status_code == 200:
+                        ok += 1
+                    else:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return ok, errors
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = {**os.environ, "WORKERS": str(workers), "SERVER_PORT": str(port)}
+    return subprocess.Popen(
+        [sys.executable, "-m", "app.server"],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    url = f"{base_url}{settings.API_V1_STR}/raffles/"
+    baseline = None
+
+    print(f"{'workers':>8} {'req/s':>10} {'errors':>8} {'scaling':>8}")
+    for workers in range(1, args.max_workers + 1):
+        server = start_server(workers, args.port)
+        try:
+            await wait_until_ready(base_url)
+            # Warm up pools and caches before measuring
+            await drive(url, args.concurrency, 1.0)
+            ok, errors = await drive(url, args.concurrency, args.duration)
+        finally:
+            server.terminate()
+            server.wait()
+
+        throughput = ok / args.duration
+        baseline = baseline or throughput
+        scaling = throughput / baseline if baseline else 0.0
+        print(f"{workers:>8} {throughput:>10.1f} {errors:>8} {scaling:>7.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,182 @@
+"""
+In-process stand-ins shared by the tests and the benchmark scripts.
+
+Replaces the Supabase client, Stripe calls and database sessions the app
+uses, so endpoints can be driven in-process without any remote service.
+Import this module before anything that reads settings.
+"""
+import itertools
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Settings required at import time; no real services are contacted
+for name in ("SECRET_KEY", "POSTGRES_SERVER", "POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB"):
+    os.environ.setdefault(name, "stub")
+
+from fastapi import FastAPI, HTTPException
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.api.dependencies import auth as auth_dependencies
+from app.api.endpoints import auth as auth_endpoints, profile as profile_endpoints
+from app.core.database import get_db, get_primary_read_db, get_read_db, get_stream_db
+from app.models.domain.base import Base
+from app.services.payments import payment_service
+
+
+class FakeResult:
+    def __init__(self, data: List[Dict[str, Any]]) -> None:
+        self.data = data
+
+
+class FakeQuery:
+    """Chainable stand-in for a PostgREST query on the users table."""
+    def __init__(self, rows: Dict[Any, Dict[str, Any]]) -> None:
+        self.rows = rows
+        self.filters: Dict[str, Any] = {}
+        self.values: Optional[Dict[str, Any]] = None
+        self.inserted: Optional[Dict[str, Any]] = None
+
+    def select(self, *args, **kwargs) -> "FakeQuery":
+        return self
+
+    def eq(self, column: str, value: Any) -> "FakeQuery":
+        self.filters[column] = value
+        return self
+
+    def insert(self, row: Dict[str, Any]) -> "FakeQuery":
+        self.inserted = row
+        return self
+
+    def update(self, values: Dict[str, Any]) -> "FakeQuery":
+        self.values = values
+        return self
+
+    def execute(self) -> FakeResult:
+        if self.inserted is not None:
+            self.rows[self.inserted["id"]] = dict(self.inserted)
+            return FakeResult([self.inserted])
+        matched = [
+            row for row in self.rows.values()
+            if all(row.get(column) == value for column, value in self.filters.items())
+        ]
+        if self.values is not None:
+            for row in matched:
+                row.update(self.values)
+        return FakeResult(matched)
+
+
+class FakeAuth:
+    """Supabase Auth with in-memory accounts and opaque tokens."""
+    def __init__(self, user_ids: itertools.count) -> None:
+        self.user_ids = user_ids
+        self.accounts: Dict[str, Dict[str, Any]] = {}
+        self.tokens: Dict[str, Any] = {}
+
+    @staticmethod
+    def _response(user_id: Any, token: Optional[str] = None) -> Any:
+        session = type("Session", (), {"access_token": token})
+        user = type("AuthUser", (), {"id": user_id})
+        return type("AuthResponse", (), {"session": session, "user": user})
+
+    def sign_up(self, credentials: Dict[str, str]) -> Any:
+        user_id = next(self.user_ids)
+        self.accounts[credentials["email"]] = {"id": user_id, "password": credentials["password"]}
+        return self._response(user_id)
+
+    def sign_in_with_password(self, credentials: Dict[str, str]) -> Any:
+        account = self.accounts[credentials["email"]]
+        token = f"token-{account['id']}"
+        self.tokens[token] = account["id"]
+        return self._response(account["id"], token)
+
+    def get_user(self, token: str) -> Any:
+        if token not in self.tokens:
+            return None
+        return self._response(self.tokens[token])
+
+
+class FakeSupabase:
+    """
+    Subset of the Supabase client the app uses.
+    New accounts get ids 1, 2, ... unless first_user_id says otherwise,
+    so they can line up with rows seeded in the SQL users table.
+    """
+    def __init__(self, first_user_id: int = 1) -> None:
+        self.users: Dict[Any, Dict[str, Any]] = {}
+        self.auth = FakeAuth(itertools.count(first_user_id))
+
+    def add_user(self, user: Dict[str, Any], password: str = "secret") -> None:
+        self.users[user["id"]] = dict(user)
+        self.auth.accounts[user["email"]] = {"id": user["id"], "password": password}
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self.users)
+
+
+class FakeStripe:
+    """Stripe calls made through PaymentService, answered in-process."""
+    def __init__(self) -> None:
+        self.intent_ids = itertools.count(1)
+        self.intents: Dict[str, Dict[str, Any]] = {}
+
+    async def create_payment_intent(self, amount_cents, currency="usd", metadata=None) -> Dict[str, Any]:
+        intent_id = f"pi_fake_{next(self.intent_ids)}"
+        self.intents[intent_id] = {"amount": amount_cents, "currency": currency, "metadata": metadata}
+        return {"client_secret": f"{intent_id}_secret", "payment_intent_id": intent_id}
+
+    async def confirm_payment(self, payment_intent_id: str) -> Optional[SimpleNamespace]:
+        """Every intent created here counts as paid; unknown ones are rejected like Stripe does."""
+        intent = self.intents.get(payment_intent_id)
+        if intent is None:
+            raise HTTPException(status_code=400, detail=f"No such payment_intent: '{payment_intent_id}'")
+        metadata = {key: str(value) for key, value in (intent["metadata"] or {}).items()}
+        return SimpleNamespace(
+            id=payment_intent_id, status="succeeded", amount=intent["amount"],
+            currency=intent["currency"], metadata=metadata
+        )
+
+    async def refund_payment(self, payment_intent_id: str, amount_cents=None) -> Dict[str, Any]:
+        return {"refund_id": f"re_{payment_intent_id}", "status": "succeeded", "amount_cents": amount_cents or 0}
+
+    async def handle_webhook_event(self, payload: bytes, sig_header: str) -> Dict[str, Any]:
+        return {"status": "unhandled", "type": "fake.event"}
+
+
+async def create_scratch_database(database_url: str) -> tuple[AsyncEngine, async_sessionmaker]:
+    """Drop and re-create every table; only point this at a scratch database."""
+    if database_url in ("sqlite://", "sqlite+aiosqlite://"):
+        # In-memory SQLite only lives as long as its single connection
+        engine = create_async_engine(database_url, poolclass=StaticPool)
+    else:
+        engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+
+
+def use_database(app: FastAPI, sessions: async_sessionmaker) -> None:
+    """Serve every database dependency from sessions."""
+    async def get_session():
+        async with sessions() as session:
+            yield session
+
+    for dependency in (get_db, get_read_db, get_primary_read_db, get_stream_db):
+        app.dependency_overrides[dependency] = get_session
+
+
+def use_fake_services(supabase: FakeSupabase, stripe: FakeStripe) -> None:
+    """Point the app's Supabase client and Stripe calls at the fakes."""
+    for module in (auth_dependencies, auth_endpoints, profile_endpoints):
+        module.supabase = supabase
+    payment_service.create_payment_intent = stripe.create_payment_intent
+    payment_service.confirm_payment = stripe.confirm_payment
+    payment_service.refund_payment = stripe.refund_payment
+    payment_service.handle_webhook_event = stripe.handle_webhook_event
@@ -0,0 +1,13 @@
+import sys
+from pathlib import Path
+
+# The in-process fakes are shared with the scripts
+sys.path.append(str(Path(__file__).parent.parent / "scripts"))
+
+
+def pytest_addoption(parser) -> None:
+    parser.addoption(
+        "--database-url",
+        default="sqlite+aiosqlite://",
+        help="Scratch database for the statement budget check; it is dropped and re-created",
+    )